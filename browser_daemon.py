@@ -0,0 +1,398 @@
+#Resident Chromium daemon shared by the Pinterest and Scribd scrapers.
+#Keeps a few warm Chromium instances alive with remote debugging (CDP) enabled,
+#so short scraper runs attach to an already running browser instead of paying cold start.
+#
+#Control protocol: one JSON request per line over TCP on 127.0.0.1 (default port 9300):
+#   {"cmd": "lease", "client": "pinterest"}   -> {"ok": true, "lease_id": "...", "endpoint": "http://127.0.0.1:9310"}
+#   {"cmd": "release", "lease_id": "...", "dirty": false}
+#   {"cmd": "status"} / {"cmd": "ping"} / {"cmd": "shutdown"}
+#A lease is exclusive and tied to the control connection - if the client dies, its lease is released.
+#Playwright clients isolate themselves with a fresh browser context; clients that use the default
+#context (Selenium) release with dirty=true and the instance is restarted on a fresh profile.
+#Scrapers lease through BrowserDaemonLease from this module; they import it only when run with --daemon.
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+import os
+import json
+import time
+import uuid
+import shutil
+import socket
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+import socketserver
+import urllib.request
+from datetime import datetime
+
+DEFAULT_CONTROL_PORT = 9300
+DEFAULT_FIRST_DEBUG_PORT = 9310
+
+
+class ChromiumInstance:
+    """One warm Chromium process with remote debugging on a fixed port"""
+
+    def __init__(self, executable, port, headless, logger):
+        self.executable = executable
+        self.port = port
+        self.headless = headless
+        self.logger = logger
+        self.process = None
+        self.user_data_dir = None
+        self.lease_id = None
+        self.launches = 0
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout=20):
+        """Launch Chromium on a fresh profile and wait until CDP answers"""
+        self.user_data_dir = tempfile.mkdtemp(prefix="browser_daemon_")
+        args = [
+            self.executable,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-dev-shm-usage",
+            "--window-size=1920,1080"
+        ]
+        if self.headless:
+            args.append("--headless=new")
+        args.append("about:blank")
+
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.launches += 1
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.is_healthy():
+                self.logger.info(f"Chromium ready on {self.endpoint} (pid {self.process.pid})")
+                return True
+            time.sleep(0.2)
+
+        self.logger.error(f"Chromium on port {self.port} did not become ready in {timeout}s")
+        return False
+
+    def is_healthy(self):
+        """Process alive and CDP /json/version answering"""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=2) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    def close_pages(self):
+        """Close every tab a client left open, keeping one blank tab"""
+        try:
+            with urllib.request.urlopen(f"{self.endpoint}/json/list", timeout=2) as response:
+                targets = json.load(response)
+            pages = [target for target in targets if target.get('type') == 'page']
+            for target in pages[1:]:
+                urllib.request.urlopen(f"{self.endpoint}/json/close/{target['id']}", timeout=2).close()
+        except Exception as e:
+            self.logger.debug(f"Error closing pages on port {self.port}: {e}")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+            self.user_data_dir = None
+
+    def restart(self):
+        self.stop()
+        return self.start()
+
+
+class BrowserDaemon:
+    """Pool of warm Chromium instances leased out over a local control socket"""
+
+    def __init__(self, size=2, control_port=DEFAULT_CONTROL_PORT, first_debug_port=DEFAULT_FIRST_DEBUG_PORT,
+                 idle_timeout=900, health_interval=15, headless=True, executable=None):
+        self.size = size
+        self.control_port = control_port
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.LOG_FOLDER = "logs"
+        os.makedirs(self.LOG_FOLDER, exist_ok=True)
+        self.logger = self.setup_logging()
+
+        executable = executable or self.find_chromium()
+        self.instances = [
+            ChromiumInstance(executable, first_debug_port + i, headless, self.logger)
+            for i in range(size)
+        ]
+        self.leases = {}
+        self.lock = threading.Lock()
+        self.last_activity = time.time()
+        self.stopping = threading.Event()
+        self.server = None
+
+        self.stats = {
+            'leases': 0,
+            'releases': 0,
+            'restarts': 0,
+            'busy_rejections': 0
+        }
+
+    def setup_logging(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_path = os.path.join(self.LOG_FOLDER, f"browser_daemon_{timestamp}.log")
+
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+        file_handler = logging.FileHandler(log_path, encoding='utf-8')
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(formatter)
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(formatter)
+
+        logger = logging.getLogger('BrowserDaemon')
+        logger.setLevel(logging.DEBUG)
+        logger.handlers = []
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        logger.info(f"Logging initialized. Log file: {log_path}")
+        return logger
+
+    @staticmethod
+    def find_chromium():
+        """Chromium bundled with Playwright"""
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as playwright:
+            return playwright.chromium.executable_path
+
+    def lease(self, client):
+        """Hand an idle healthy instance to a client exclusively"""
+        tried = set()
+        while True:
+            with self.lock:
+                self.last_activity = time.time()
+                instance = next((i for i in self.instances if i.lease_id is None and i not in tried), None)
+                if instance is None:
+                    self.stats['busy_rejections'] += 1
+                    return {'ok': False, 'error': 'no idle browser'}
+                # Reserved while its health is checked outside the lock
+                lease_id = instance.lease_id = uuid.uuid4().hex
+            tried.add(instance)
+
+            if instance.is_healthy():
+                with self.lock:
+                    self.leases[lease_id] = {'instance': instance, 'client': client, 'since': time.time()}
+                    self.stats['leases'] += 1
+                self.logger.info(f"Leased {instance.endpoint} to {client} ({lease_id})")
+                return {'ok': True, 'lease_id': lease_id, 'endpoint': instance.endpoint}
+
+            with self.lock:
+                instance.lease_id = None
+
+    def release(self, lease_id, dirty=False):
+        """Give an instance back; dirty instances are restarted on a fresh profile"""
+        with self.lock:
+            self.last_activity = time.time()
+            lease = self.leases.pop(lease_id, None)
+            if lease is None:
+                return {'ok': False, 'error': 'unknown lease'}
+            self.stats['releases'] += 1
+
+        instance = lease['instance']
+        if dirty:
+            # Relaunching can take longer than the client's socket timeout - the instance stays
+            # reserved until the restart thread hands it back
+            self.logger.info(f"Restarting {instance.endpoint} after dirty release by {lease['client']}")
+            threading.Thread(target=self._restart_released, args=(instance,), name="BrowserDaemonRestart", daemon=True).start()
+            return {'ok': True}
+
+        instance.close_pages()
+        with self.lock:
+            instance.lease_id = None
+        return {'ok': True}
+
+    def _restart_released(self, instance):
+        try:
+            instance.restart()
+        finally:
+            with self.lock:
+                self.stats['restarts'] += 1
+                instance.lease_id = None
+
+    def status(self):
+        with self.lock:
+            leased_to = {
+                instance.endpoint: self.leases[instance.lease_id]['client'] if instance.lease_id in self.leases else None
+                for instance in self.instances
+            }
+            stats = dict(self.stats)
+            idle_seconds = round(time.time() - self.last_activity, 1)
+        return {
+            'ok': True,
+            'instances': [
+                {
+                    'endpoint': instance.endpoint,
+                    'healthy': instance.is_healthy(),
+                    'leased_to': leased_to[instance.endpoint],
+                    'launches': instance.launches
+                }
+                for instance in self.instances
+            ],
+            'stats': stats,
+            'idle_seconds': idle_seconds
+        }
+
+    def health_loop(self):
+        """Restart dead idle instances and shut down after idle_timeout without leases"""
+        while not self.stopping.wait(self.health_interval):
+            for instance in self.instances:
+                if instance.lease_id is None and not instance.is_healthy():
+                    self.logger.warning(f"Chromium on {instance.endpoint} is unhealthy - restarting")
+                    instance.restart()
+                    self.stats['restarts'] += 1
+
+            with self.lock:
+                idle = not self.leases and time.time() - self.last_activity > self.idle_timeout
+            if idle:
+                self.logger.info(f"No leases for {self.idle_timeout}s - shutting down")
+                self.shutdown()
+                return
+
+    def handle_request(self, request, connection_leases):
+        cmd = request.get('cmd')
+        if cmd == 'lease':
+            response = self.lease(request.get('client', 'unknown'))
+            if response['ok']:
+                connection_leases.add(response['lease_id'])
+            return response
+        if cmd == 'release':
+            connection_leases.discard(request.get('lease_id'))
+            return self.release(request.get('lease_id'), bool(request.get('dirty')))
+        if cmd == 'status':
+            return self.status()
+        if cmd == 'ping':
+            return {'ok': True}
+        if cmd == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}
+        return {'ok': False, 'error': f'unknown command {cmd!r}'}
+
+    def serve_forever(self):
+        for instance in self.instances:
+            instance.start()
+
+        daemon = self
+
+        class ControlHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                connection_leases = set()
+                try:
+                    for line in self.rfile:
+                        try:
+                            response = daemon.handle_request(json.loads(line), connection_leases)
+                        except ValueError:
+                            response = {'ok': False, 'error': 'invalid JSON'}
+                        self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+                        self.wfile.flush()
+                except (ConnectionError, OSError):
+                    pass
+                finally:
+                    # Client went away without releasing - its browser state can't be trusted
+                    for lease_id in connection_leases:
+                        daemon.release(lease_id, dirty=True)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", self.control_port), ControlHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.health_loop, name="BrowserDaemonHealth", daemon=True).start()
+
+        self.logger.info(f"Browser daemon listening on 127.0.0.1:{self.control_port} with {self.size} warm Chromium instance(s)")
+        print(f"🌐 Browser daemon ready on 127.0.0.1:{self.control_port} ({self.size} warm browsers)")
+        try:
+            self.server.serve_forever()
+        finally:
+            for instance in self.instances:
+                instance.stop()
+            self.logger.info(f"Browser daemon stopped. Stats: {self.stats}")
+
+    def shutdown(self):
+        self.stopping.set()
+        if self.server is not None:
+            self.server.shutdown()
+
+
+class BrowserDaemonLease:
+    """Client side: exclusive lease on a warm Chromium kept by this daemon
+
+    The lease lives as long as the control connection, so the daemon gets the
+    browser back even if the client process dies without calling release().
+    """
+
+    def __init__(self, address, client="scraper", timeout=5):
+        self.sock = socket.create_connection(address, timeout=timeout)
+        self.file = self.sock.makefile('rw', encoding='utf-8')
+        response = self._call({'cmd': 'lease', 'client': client})
+        if not response.get('ok'):
+            self.sock.close()
+            raise RuntimeError(f"Browser daemon refused lease: {response.get('error')}")
+        self.lease_id = response['lease_id']
+        self.endpoint = response['endpoint']
+
+    def _call(self, request):
+        self.file.write(json.dumps(request) + "\n")
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def release(self, dirty=False):
+        try:
+            self._call({'cmd': 'release', 'lease_id': self.lease_id, 'dirty': dirty})
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.sock.close()
+
+    @staticmethod
+    def parse_address(value):
+        """'host:port', ':port' or 'port' -> (host, port); host defaults to 127.0.0.1"""
+        host, _, port = value.rpartition(':')
+        return (host or '127.0.0.1', int(port))
+
+
+def daemon_request(request, address=("127.0.0.1", DEFAULT_CONTROL_PORT), timeout=5):
+    """Send one control request on a fresh connection (status/ping/shutdown)"""
+    with socket.create_connection(address, timeout=timeout) as sock:
+        sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        return json.loads(sock.makefile('r', encoding='utf-8').readline())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident Chromium daemon for the scrapers")
+    parser.add_argument("--size", type=int, default=2, help="Number of warm Chromium instances (default 2)")
+    parser.add_argument("--port", type=int, default=DEFAULT_CONTROL_PORT, help="Control port on 127.0.0.1")
+    parser.add_argument("--debug-port", type=int, default=DEFAULT_FIRST_DEBUG_PORT, help="CDP port of the first instance")
+    parser.add_argument("--idle-timeout", type=int, default=900, help="Shut down after this many seconds without leases")
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    parser.add_argument("--chromium", help="Chromium executable (default: the one bundled with Playwright)")
+    parser.add_argument("--status", action="store_true", help="Print the status of a running daemon and exit")
+    parser.add_argument("--stop", action="store_true", help="Stop a running daemon and exit")
+    args = parser.parse_args()
+
+    if args.status or args.stop:
+        print(json.dumps(daemon_request({'cmd': 'shutdown' if args.stop else 'status'}, ("127.0.0.1", args.port)), indent=2))
+    else:
+        BrowserDaemon(
+            size=args.size,
+            control_port=args.port,
+            first_debug_port=args.debug_port,
+            idle_timeout=args.idle_timeout,
+            headless=not args.headed,
+            executable=args.chromium
+        ).serve_forever()
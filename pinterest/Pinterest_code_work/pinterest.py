@@ -8,6 +8,9 @@ from playwright.async_api import async_playwright
 from urllib.parse import quote
 
 class PinterestScraper:
+    MAX_IN_FLIGHT = 8     # Downloads running at once
+    PER_HOST_LIMIT = 6    # Politeness cap per image host
+
     def __init__(self):
         self.SAVE_FOLDER = "scraped_data/pinterest_images"
         os.makedirs(self.SAVE_FOLDER, exist_ok=True)
@@ -90,17 +93,18 @@ class PinterestScraper:
             print("No images found.")
             return
 
-        connector = aiohttp.TCPConnector(limit=5)
+        # Sliding window: the connector caps connections overall and per host, and the
+        # next download starts as soon as any finishes instead of after a fixed batch
+        connector = aiohttp.TCPConnector(limit=self.MAX_IN_FLIGHT, limit_per_host=self.PER_HOST_LIMIT)
         timeout = aiohttp.ClientTimeout(total=30)
 
         async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            tasks = []
-            for idx, url in enumerate(image_urls):
-                tasks.append(self.download_image(session, url, idx, query))
-                if len(tasks) >= 5 or idx == len(image_urls) - 1:
-                    await asyncio.gather(*tasks)
-                    tasks = []
-                    await asyncio.sleep(1)
+            tasks = [self.download_image(session, url, idx, query) for idx, url in enumerate(image_urls)]
+            done = 0
+            for task in asyncio.as_completed(tasks):
+                await task
+                done += 1
+                print(f"Progress: {done}/{len(tasks)}")
 
 if __name__ == "__main__":
     async def main():
@@ -7,19 +7,3057 @@
 
 import os
 import re
+import sys
+import mmap
+import bisect
+import struct
+import asyncio
+import threading
+import argparse
+import heapq
+import queue
+import itertools
+import random
+import codecs
+import hashlib
+import sqlite3
 import requests
 import urllib.parse
 import json
 import logging
-from datetime import datetime
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from time import sleep
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from html.parser import HTMLParser
 from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+
+try:
+    import psutil  # Optional: browser RSS sampling for the memory governor
+except ImportError:
+    psutil = None
+
+def load_daemon_lease():
+    """BrowserDaemonLease from browser_daemon.py at the repository root - imported only when a daemon is used"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.append(root)
+    from browser_daemon import BrowserDaemonLease
+    return BrowserDaemonLease
+
+class BrowserPool:
+    """Long-lived Chromium shared by every step of a PinterestScraper instance.
+
+    The browser is launched once and pages are handed out from a shared context.
+    The context is recycled after `pages_per_context` pages so cookies, caches and
+    leftover DOM from earlier pages don't pile up over a long run.
+
+    Playwright's sync API is bound to the thread that started it, so each thread
+    using the pool (e.g. the batch download worker) gets its own browser; counters
+    and settings are shared.
+
+    With `profile_dir` set, each thread runs a persistent context on that profile
+    instead, so JS bundles, cookies and consent state stay in a warm disk cache
+    across contexts and runs. The cache is pruned to `cache_size_mb` before launch.
+
+    With `daemon_address` set, each thread leases an already running Chromium from
+    browser_daemon.py and attaches over CDP instead of launching one; contexts stay
+    per-run, so nothing leaks between clients. Falls back to launching if the daemon
+    is unreachable or busy.
+    """
+
+    # Profile sub-directories that only hold re-downloadable cache data
+    CACHE_DIRS = ['Default/Cache', 'Default/Code Cache', 'Default/GPUCache', 'ShaderCache', 'GrShaderCache']
+
+    def __init__(self, logger, headless=True, pages_per_context=25, context_options=None,
+                 profile_dir=None, cache_size_mb=512, daemon_address=None):
+        self.logger = logger
+        self.headless = headless
+        self.pages_per_context = pages_per_context
+        self.profile_dir = profile_dir
+        self.daemon_address = daemon_address
+        self.cache_size_bytes = cache_size_mb * 1024 * 1024
+        self.context_options = context_options or {
+            'viewport': {'width': 1920, 'height': 1080},
+            'device_scale_factor': 0.25  # Set default zoom to 25%
+        }
+
+        self._local = threading.local()
+
+        self.stats = {
+            'browser_launches': 0,
+            'browser_reuses': 0,
+            'daemon_attaches': 0,
+            'context_launches': 0,
+            'context_reuses': 0,
+            'context_recycles': 0,
+            'pages_served': 0,
+            'cache_requests': 0,
+            'cache_hits': 0
+        }
+
+    def _state(self):
+        """Playwright objects of the calling thread"""
+        state = self._local
+        if not hasattr(state, 'playwright'):
+            state.playwright = None
+            state.browser = None
+            state.context = None
+            state.context_pages = 0
+            state.lease = None
+        return state
+
+    def _ensure_browser(self, state):
+        """Launch Chromium on first use, or again if it died"""
+        if self.profile_dir:
+            # Persistent contexts launch their own browser in _ensure_context
+            return
+
+        if state.browser is not None and state.browser.is_connected():
+            self.stats['browser_reuses'] += 1
+            return
+
+        if state.playwright is None:
+            state.playwright = sync_playwright().start()
+
+        state.context = None
+        state.context_pages = 0
+        if self.daemon_address and self._attach_to_daemon(state):
+            return
+
+        self.logger.info(f"Launching pooled Chromium browser ({threading.current_thread().name})")
+        state.browser = state.playwright.chromium.launch(headless=self.headless)
+        self.stats['browser_launches'] += 1
+
+    def _attach_to_daemon(self, state):
+        """Lease a warm browser from the daemon and connect over CDP; False to launch locally"""
+        if state.lease is not None:
+            # The leased browser went away - give it back so the daemon restarts it
+            state.lease.release(dirty=True)
+            state.lease = None
+
+        try:
+            state.lease = load_daemon_lease()(self.daemon_address, client="pinterest")
+            state.browser = state.playwright.chromium.connect_over_cdp(state.lease.endpoint)
+        except Exception as e:
+            self.logger.warning(f"Browser daemon at {self.daemon_address[0]}:{self.daemon_address[1]} unavailable ({e}) - launching locally")
+            if state.lease is not None:
+                state.lease.release(dirty=True)
+                state.lease = None
+            return False
+
+        self.logger.info(f"Attached to daemon browser {state.lease.endpoint} ({threading.current_thread().name})")
+        self.stats['daemon_attaches'] += 1
+        return True
+
+    def _ensure_context(self, state):
+        """Open a context, recycling the current one once it served enough pages"""
+        if state.context is not None and state.context_pages >= self.pages_per_context:
+            self.recycle_context()
+
+        if state.context is None:
+            if self.profile_dir:
+                state.context = self._launch_persistent_context(state)
+            else:
+                state.context = state.browser.new_context(**self.context_options)
+            state.context_pages = 0
+            self.stats['context_launches'] += 1
+            self.logger.debug("Opened new browser context")
+        else:
+            self.stats['context_reuses'] += 1
+
+    def _launch_persistent_context(self, state):
+        """Launch Chromium on the calling thread's profile directory"""
+        if state.playwright is None:
+            state.playwright = sync_playwright().start()
+
+        # Two Chromium processes can't share a profile, so worker threads get their own
+        user_data_dir = self.profile_dir
+        if threading.current_thread() is not threading.main_thread():
+            user_data_dir = f"{self.profile_dir}-{threading.current_thread().name}"
+        self.prune_profile_cache(user_data_dir, self.cache_size_bytes, self.logger)
+
+        self.logger.info(f"Launching Chromium on persistent profile {user_data_dir}")
+        self.stats['browser_launches'] += 1
+        return state.playwright.chromium.launch_persistent_context(
+            user_data_dir,
+            headless=self.headless,
+            args=[f"--disk-cache-size={self.cache_size_bytes}"],
+            **self.context_options
+        )
+
+    @classmethod
+    def prune_profile_cache(cls, profile_dir, max_bytes, logger):
+        """Delete the oldest cache files of a profile until the caches fit in max_bytes"""
+        cache_files = []
+        for cache_dir in cls.CACHE_DIRS:
+            for root, _, files in os.walk(os.path.join(profile_dir, cache_dir)):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    cache_files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in cache_files)
+        if total <= max_bytes:
+            return
+
+        removed = 0
+        for _, size, path in sorted(cache_files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        logger.info(f"Pruned {removed} cache files from {profile_dir} - cache now {total / (1024 * 1024):.0f} MB")
+
+    def track_cache_hits(self, cdp_session):
+        """Count disk-cache hits reported by a page's CDP session (Network domain enabled)"""
+        cdp_session.on("Network.responseReceived", self._on_cdp_response)
+
+    def _on_cdp_response(self, params):
+        self.stats['cache_requests'] += 1
+        if params.get('response', {}).get('fromDiskCache'):
+            self.stats['cache_hits'] += 1
+
+    def acquire_page(self):
+        """Get a fresh page from the pooled browser/context"""
+        state = self._state()
+        self._ensure_browser(state)
+        self._ensure_context(state)
+
+        page = state.context.new_page()
+        if self.profile_dir:
+            try:
+                cdp_session = state.context.new_cdp_session(page)
+                cdp_session.send("Network.enable")
+                self.track_cache_hits(cdp_session)
+            except Exception as e:
+                self.logger.debug(f"Could not track cache hits: {e}")
+        state.context_pages += 1
+        self.stats['pages_served'] += 1
+        self.logger.debug(f"Acquired page {state.context_pages}/{self.pages_per_context} of current context")
+        return page
+
+    def release_page(self, page):
+        """Close a page previously handed out by acquire_page"""
+        try:
+            page.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing pooled page: {e}")
+
+    def recycle_context(self):
+        """Throw away the calling thread's context; its next page gets a new one"""
+        state = self._state()
+        if state.context is None:
+            return
+
+        self.logger.debug(f"Recycling browser context after {state.context_pages} pages")
+        try:
+            state.context.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing browser context: {e}")
+        state.context = None
+        state.context_pages = 0
+        self.stats['context_recycles'] += 1
+
+    def close(self):
+        """Shut down the calling thread's context, browser and Playwright driver"""
+        state = self._state()
+        self.recycle_context()
+
+        if state.browser is not None:
+            try:
+                # For a daemon browser this only disconnects; Chromium stays warm
+                state.browser.close()
+            except Exception as e:
+                self.logger.debug(f"Error closing pooled browser: {e}")
+            state.browser = None
+
+        if state.lease is not None:
+            state.lease.release()
+            state.lease = None
+
+        if state.playwright is not None:
+            try:
+                state.playwright.stop()
+            except Exception as e:
+                self.logger.debug(f"Error stopping Playwright: {e}")
+            state.playwright = None
+
+    def log_stats(self):
+        """Log launch/reuse counters"""
+        self.logger.info(f"Browser launches: {self.stats['browser_launches']}, reuses: {self.stats['browser_reuses']}, daemon attaches: {self.stats['daemon_attaches']}")
+        self.logger.info(f"Context launches: {self.stats['context_launches']}, reuses: {self.stats['context_reuses']}, recycles: {self.stats['context_recycles']}")
+        self.logger.info(f"Pages served from pool: {self.stats['pages_served']}")
+        if self.stats['cache_requests']:
+            hit_rate = self.stats['cache_hits'] / self.stats['cache_requests'] * 100
+            self.logger.info(f"Profile disk cache: {self.stats['cache_hits']}/{self.stats['cache_requests']} responses ({hit_rate:.1f}% hit rate)")
+
+class AsyncSimilarPinExpander:
+    """Expands many main pins at once on an async Playwright browser.
+
+    The sync API can't run several pages concurrently, so this engine keeps its own
+    event loop on a background thread and a browser that stays up between calls.
+    Every expansion shares one `seen_ids` set, so two main pins never both claim
+    the same similar pin.
+    """
+
+    def __init__(self, scraper, concurrency=4, headless=True, context_options=None, profile_dir=None,
+                 daemon_address=None):
+        self.scraper = scraper
+        self.logger = scraper.logger
+        self.concurrency = concurrency
+        self.headless = headless
+        # Persistent profile mode: all expansions share one warm context on this profile
+        self.profile_dir = profile_dir
+        # Daemon mode: attach to a leased warm browser instead of launching one
+        self.daemon_address = daemon_address
+        self.lease = None
+        self.context_options = context_options or {
+            'viewport': {'width': 1920, 'height': 1080},
+            'device_scale_factor': 0.25  # Set default zoom to 25%
+        }
+
+        self.loop = None
+        self.thread = None
+        self.playwright = None
+        self.browser = None
+        self.persistent_context = None
+
+        self.stats = {
+            'browser_launches': 0,
+            'pages_expanded': 0,
+            'peak_in_flight': 0
+        }
+        self.in_flight = 0
+        # Created on the expansion loop; serializes relaunching a dead browser
+        self.browser_lock = None
+
+    def _ensure_loop(self):
+        """Start the background event loop on first use"""
+        if self.loop is not None:
+            return
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="AsyncSimilarPinExpander", daemon=True)
+        self.thread.start()
+
+    def expand(self, main_pin_urls, similar_count, seen_ids):
+        """Expand all main pins concurrently; returns one list of NEW similar pin URLs per main pin
+        
+        similar_count is either one count for every pin or a list with one count per pin.
+        """
+        self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self._expand_all(main_pin_urls, similar_count, seen_ids), self.loop
+        )
+        return future.result()
+
+    async def _ensure_browser(self):
+        """Launch the async Chromium on first use, or again if it died"""
+        if self.browser is not None and self.browser.is_connected():
+            return
+        if self.persistent_context is not None:
+            return
+
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+
+        if self.profile_dir:
+            pool = self.scraper.browser_pool
+            BrowserPool.prune_profile_cache(self.profile_dir, pool.cache_size_bytes, self.logger)
+            self.logger.info(f"Launching async Chromium on persistent profile {self.profile_dir}")
+            self.persistent_context = await self.playwright.chromium.launch_persistent_context(
+                self.profile_dir,
+                headless=self.headless,
+                args=[f"--disk-cache-size={pool.cache_size_bytes}"],
+                **self.context_options
+            )
+            self.stats['browser_launches'] += 1
+            return
+
+        if self.daemon_address:
+            if self.lease is not None:
+                self.lease.release(dirty=True)
+                self.lease = None
+            try:
+                self.lease = load_daemon_lease()(self.daemon_address, client="pinterest")
+                self.browser = await self.playwright.chromium.connect_over_cdp(self.lease.endpoint)
+                self.logger.info(f"Attached async expansion to daemon browser {self.lease.endpoint}")
+                return
+            except Exception as e:
+                self.logger.warning(f"Browser daemon unavailable for async expansion ({e}) - launching locally")
+                if self.lease is not None:
+                    self.lease.release(dirty=True)
+                    self.lease = None
+
+        self.logger.info(f"Launching async Chromium for similar-pin expansion (concurrency {self.concurrency})")
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        self.stats['browser_launches'] += 1
+
+    async def _expand_all(self, main_pin_urls, similar_count, seen_ids):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        counts = similar_count if isinstance(similar_count, list) else [similar_count] * len(main_pin_urls)
+        tasks = [
+            self._expand_one(semaphore, i, len(main_pin_urls), pin_url, count, seen_ids)
+            for i, (pin_url, count) in enumerate(zip(main_pin_urls, counts), 1)
+        ]
+        # One failed pin must not cancel the keyword - it just contributes no similar pins
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        similar = []
+        for pin_url, result in zip(main_pin_urls, results):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Similar-pin expansion of {pin_url} failed: {result}")
+                result = []
+            similar.append(result)
+        return similar
+
+    async def _open_page(self):
+        """New page for one expansion: its own context, or a tab of the persistent context"""
+        # A crashed Chromium is relaunched before the next page instead of failing every pin after it
+        if self.browser_lock is None:
+            self.browser_lock = asyncio.Lock()
+        async with self.browser_lock:
+            await self._ensure_browser()
+
+        if self.persistent_context is None:
+            context = await self.browser.new_context(**self.context_options)
+            return context, await context.new_page()
+
+        page = await self.persistent_context.new_page()
+        try:
+            cdp_session = await self.persistent_context.new_cdp_session(page)
+            await cdp_session.send("Network.enable")
+            self.scraper.browser_pool.track_cache_hits(cdp_session)
+        except Exception as e:
+            self.logger.debug(f"Could not track cache hits: {e}")
+        return None, page
+
+    async def _close_page(self, context, page):
+        try:
+            if context is not None:
+                await context.close()
+            else:
+                await page.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing expansion page: {e}")
+
+    async def _load_pin_page(self, page, pin_url):
+        """Set up discovery routing, harvester and pacing on a page and open the pin; returns (harvester, tracker)"""
+        await self.scraper.route_policy.apply_async(page, "discovery")
+        harvester = None
+        if self.scraper.collection_mode == "xhr":
+            harvester = FeedResponseHarvester(self.logger)
+            harvester.attach(page)
+        tracker = self.scraper.pacer.attach(page)
+
+        await page.goto(pin_url, timeout=30000)
+        await page.evaluate("document.body.style.zoom = '0.25'")
+        await self._wait_for_page_load(page, tracker)
+        return harvester, tracker
+
+    async def _resume_position(self, page, harvester, page_url):
+        """Async counterpart of PinterestScraper._resume_position"""
+        scraper = self.scraper
+        known = scraper.scroll_history.known_position(scraper.current_keyword, page_url, scraper.is_pin_claimed)
+        if not known:
+            return 0, None
+
+        cursor = scraper.scroll_history.bookmark(scraper.current_keyword, page_url, known) if harvester is not None else None
+        if cursor is not None:
+            self.logger.info(f"Jumping past {cursor['pins']} already harvested pins of {page_url} via feed bookmark")
+            scraper.stats['history_pins_skipped'] += cursor['pins']
+            return cursor['pins'], cursor
+
+        self.logger.info(f"Fast-scrolling past {known} already harvested pins of {page_url}")
+        await page.evaluate(PinterestScraper.PIN_HARVEST_INSTALL_JS)
+        scraper.stats['history_pins_skipped'] += await scraper.pacer.fast_forward_async(page, known)
+        return 0, None
+
+    async def _restore_position(self, page, harvester, previous_harvester, pins):
+        """Async counterpart of PinterestScraper._restore_position"""
+        if not pins:
+            return 0, None
+
+        cursor = previous_harvester.last_feed if previous_harvester is not None else None
+        if cursor is not None:
+            harvester.last_feed = cursor
+            return pins, cursor
+
+        await page.evaluate(PinterestScraper.PIN_HARVEST_INSTALL_JS)
+        await self.scraper.pacer.fast_forward_async(page, pins)
+        return 0, None
+
+    async def _advance_page(self, page, tracker, harvester, cursor):
+        """Async counterpart of PinterestScraper._advance_page"""
+        if cursor is not None:
+            cursor = await harvester.fetch_next_async(page, cursor)
+            if cursor is not None:
+                return cursor
+        await self.scraper.pacer.scroll_async(page, tracker, fixed_delay=4, harvester=harvester)
+        return None
+
+    async def _wait_for_page_load(self, page, tracker):
+        """Async counterpart of PinterestScraper.wait_for_page_load"""
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=20000)
+            if not await self.scraper.pacer.wait_for_grid_async(page, tracker):
+                self.logger.debug("No Pinterest-specific selectors found, continuing anyway")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Page load wait error: {e}")
+            return False
+
+    async def _scan_page_for_pins(self, page, harvester, total_pins_checked):
+        """Async counterpart of PinterestScraper._scan_page_for_pins"""
+        if harvester is not None:
+            feed_pins = await harvester.drain_async()
+            if total_pins_checked == 0:
+                feed_pins = harvester.parse_initial_state(await page.evaluate(PinterestScraper.INITIAL_STATE_JS)) + feed_pins
+            return [(pin['url'], pin) for pin in feed_pins], total_pins_checked + len(feed_pins)
+
+        batch = await page.evaluate(PinterestScraper.PIN_HARVEST_JS)
+        return PinterestScraper._grid_candidates(batch), batch['total']
+
+    async def _expand_one(self, semaphore, index, total, pin_url, count, seen_ids):
+        """Scroll one pin page until `count` globally NEW similar pins are found"""
+        async with semaphore:
+            pin_id = self.scraper.extract_pin_id_from_url(pin_url)
+            governor = self.scraper.memory_governor
+            # Hold off opening another page while the browsers are near the memory budget
+            while self.in_flight >= governor.allowed_pages(self.concurrency, self.in_flight):
+                governor.stats['throttled_waits'] += 1
+                await asyncio.sleep(1)
+            self.in_flight += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.in_flight)
+            self.logger.info(f"Processing main pin {index}/{total}: {pin_id} ({self.in_flight} in flight)")
+            print(f"   📌 Processing main pin {index}/{total}: {pin_id}")
+
+            context = page = None
+            pacer = self.scraper.pacer
+            similar_pins = []
+
+            try:
+                context, page = await self._open_page()
+                harvester, tracker = await self._load_pin_page(page, pin_url)
+                pin_offset, feed_cursor = await self._resume_position(page, harvester, pin_url)
+
+                scroll_count = 0
+                max_scrolls = 40
+                previous_similar_count = 0
+                stable_count = 0
+                total_pins_checked = 0
+
+                while len(similar_pins) < count and scroll_count < max_scrolls and not self.scraper.stop_discovery.is_set():
+                    scroll_count += 1
+                    feed_cursor = await self._advance_page(page, tracker, harvester, feed_cursor)
+
+                    candidates, current_total_pins = await self._scan_page_for_pins(page, harvester, total_pins_checked)
+                    self.scraper._record_scroll_history(pin_url, pin_offset, candidates, current_total_pins)
+
+                    for full_url, metadata in candidates:
+                        similar_pin_id = self.scraper.extract_pin_id_from_url(full_url)
+
+                        # Check and claim in one step - no await in between, so the shared set stays consistent
+                        if not similar_pin_id or similar_pin_id == pin_id or similar_pin_id in seen_ids:
+                            continue
+                        seen_ids.add(similar_pin_id)
+
+                        if not self.scraper.is_pin_claimed(similar_pin_id):
+                            similar_pins.append(full_url)
+                            self.scraper.pin_parents[similar_pin_id] = pin_id
+                            if metadata:
+                                self.scraper.pin_metadata[similar_pin_id] = metadata
+                            self.scraper.checkpoint.add_pending(self.scraper.current_keyword, full_url)
+                            if self.scraper.pin_sink is not None:
+                                # A full download queue blocks the sink - keep that off the event loop
+                                await asyncio.get_running_loop().run_in_executor(None, self.scraper.pin_sink, full_url)
+                            self.logger.debug(f"Found NEW similar pin {len(similar_pins)}/{count} for {pin_id}: {similar_pin_id}")
+                            if len(similar_pins) >= count:
+                                break
+
+                    total_pins_checked = current_total_pins
+
+                    if current_total_pins == previous_similar_count:
+                        stable_count += 1
+                        if stable_count >= pacer.max_idle_scrolls:
+                            self.logger.debug(f"No new similar pins loading for {pin_id}. Found {len(similar_pins)}/{count}")
+                            break
+                    else:
+                        stable_count = 0
+
+                    previous_similar_count = current_total_pins
+                    self.scraper.checkpoint.record_scroll(self.scraper.current_keyword, pin_url, scroll_count, similar_pins)
+
+                    if governor.due(scroll_count) and governor.needs_recycle(await governor.js_heap_mb_async(page), pin_id):
+                        # Everything harvested so far is already in similar_pins/seen_ids
+                        previous_harvester, harvested = harvester, pin_offset + total_pins_checked
+                        await self._close_page(context, page)
+                        context = page = None
+                        context, page = await self._open_page()
+                        harvester, tracker = await self._load_pin_page(page, pin_url)
+                        total_pins_checked = previous_similar_count = stable_count = 0
+                        pin_offset, feed_cursor = await self._restore_position(page, harvester, previous_harvester, harvested)
+
+                self.scraper._finish_scroll_history(pin_url, harvester, pin_offset + total_pins_checked)
+                # Only a finished page counts as expanded; a failed one stays in scroll_progress for --resume
+                self.scraper.checkpoint.record_expanded(self.scraper.current_keyword, pin_url, similar_pins)
+                self.logger.debug(f"Found {len(similar_pins)} NEW similar pins for pin {pin_id}")
+                print(f"      ➕ Added {len(similar_pins)} NEW similar pins from main pin {pin_id}")
+                return similar_pins
+
+            except Exception as e:
+                self.logger.error(f"Error getting similar pins from {pin_id}: {e}")
+                return []
+            finally:
+                if page is not None:
+                    await self._close_page(context, page)
+                self.in_flight -= 1
+                self.stats['pages_expanded'] += 1
+
+    async def _shutdown(self):
+        if self.persistent_context is not None:
+            await self.persistent_context.close()
+            self.persistent_context = None
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self.lease is not None:
+            self.lease.release()
+            self.lease = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    def close(self):
+        """Close the async browser and stop the background loop"""
+        if self.loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=30)
+        except Exception as e:
+            self.logger.debug(f"Error shutting down async expander: {e}")
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=10)
+        self.loop.close()
+        self.loop = None
+        self.thread = None
+
+class FeedResponseHarvester:
+    """Collects pins from Pinterest's internal JSON feed responses.
+
+    While a search or pin page scrolls, Pinterest fetches its grid through
+    `/resource/...Resource/get/` XHRs whose payloads already hold pin ids, titles
+    and image URLs for every size. Responses are only queued in the event handler
+    and parsed on `drain()`, so the handler never blocks the page.
+    """
+
+    FEED_URL_PATTERN = re.compile(
+        r'/resource/(BaseSearch|Search|RelatedModules|RelatedPinFeed|UnauthRelatedModules)Resource/get'
+    )
+    # Largest first - used to pick the image URL to download
+    IMAGE_SIZES = ['orig', '1200x', '736x', '600x', '474x', '236x', '170x']
+
+    # Fetch one feed page from inside the page, so Pinterest sees its own cookies and headers
+    FEED_FETCH_JS = """async (url) => {
+        const response = await fetch(url, {
+            credentials: 'include',
+            headers: {'Accept': 'application/json', 'X-Requested-With': 'XMLHttpRequest'}
+        });
+        return response.ok ? await response.text() : null;
+    }"""
+
+    def __init__(self, logger):
+        self.logger = logger
+        self.pending = []
+        # Feed responses captured so far - the scroll pacer's growth signal in xhr mode
+        self.responses_seen = 0
+        # Pins fetched directly by bookmark, handed out on the next drain
+        self.fetched = []
+        # Deepest feed position seen: {'url': feed request URL, 'bookmark': next-page bookmark}
+        self.last_feed = None
+        self.stats = {
+            'feed_responses': 0,
+            'pins_parsed': 0,
+            'parse_errors': 0,
+            'bookmark_fetches': 0
+        }
+
+    def attach(self, page):
+        """Start capturing feed responses of a page (call before goto)"""
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if self.FEED_URL_PATTERN.search(response.url):
+            self.pending.append(response)
+            self.responses_seen += 1
+
+    def drain(self):
+        """Parse every feed response captured since the last drain (sync pages)"""
+        responses, self.pending = self.pending, []
+        pins, self.fetched = self.fetched, []
+        for response in responses:
+            try:
+                payload = response.json()
+                self._remember_bookmark(response, payload)
+                pins.extend(self.parse_payload(payload))
+                self.stats['feed_responses'] += 1
+            except Exception as e:
+                self.stats['parse_errors'] += 1
+                self.logger.debug(f"Could not parse feed response {response.url}: {e}")
+        self.stats['pins_parsed'] += len(pins)
+        return pins
+
+    async def drain_async(self):
+        """Parse every feed response captured since the last drain (async pages)"""
+        responses, self.pending = self.pending, []
+        pins, self.fetched = self.fetched, []
+        for response in responses:
+            try:
+                payload = await response.json()
+                self._remember_bookmark(response, payload)
+                pins.extend(self.parse_payload(payload))
+                self.stats['feed_responses'] += 1
+            except Exception as e:
+                self.stats['parse_errors'] += 1
+                self.logger.debug(f"Could not parse feed response {response.url}: {e}")
+        self.stats['pins_parsed'] += len(pins)
+        return pins
+
+    def _remember_bookmark(self, response, payload):
+        if response.request.method != "GET":
+            return
+        bookmark = (payload.get('resource_response') or {}).get('bookmark')
+        if bookmark and bookmark != '-end-':
+            self.last_feed = {'url': response.url, 'bookmark': bookmark}
+
+    @staticmethod
+    def bookmark_url(request_url, bookmark):
+        """The same feed request, asking for the page after `bookmark`"""
+        parts = urllib.parse.urlsplit(request_url)
+        query = urllib.parse.parse_qs(parts.query)
+        data = json.loads(query['data'][0])
+        data.setdefault('options', {})['bookmarks'] = [bookmark]
+        query['data'] = [json.dumps(data, separators=(',', ':'))]
+        return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query, doseq=True)))
+
+    def _take_fetched(self, cursor, body):
+        """Queue the pins of a bookmark fetch; returns the cursor of the following page, None at the end"""
+        payload = json.loads(body)
+        self.fetched.extend(self.parse_payload(payload))
+        self.stats['bookmark_fetches'] += 1
+        bookmark = (payload.get('resource_response') or {}).get('bookmark')
+        if not bookmark or bookmark == '-end-':
+            return None
+        self.last_feed = {'url': cursor['url'], 'bookmark': bookmark}
+        return self.last_feed
+
+    def fetch_next(self, page, cursor):
+        """Fetch the feed page after `cursor` without scrolling; None when the feed ends or the fetch fails"""
+        try:
+            body = page.evaluate(self.FEED_FETCH_JS, self.bookmark_url(cursor['url'], cursor['bookmark']))
+            return self._take_fetched(cursor, body) if body else None
+        except Exception as e:
+            self.stats['parse_errors'] += 1
+            self.logger.debug(f"Bookmark fetch failed: {e}")
+            return None
+
+    async def fetch_next_async(self, page, cursor):
+        try:
+            body = await page.evaluate(self.FEED_FETCH_JS, self.bookmark_url(cursor['url'], cursor['bookmark']))
+            return self._take_fetched(cursor, body) if body else None
+        except Exception as e:
+            self.stats['parse_errors'] += 1
+            self.logger.debug(f"Bookmark fetch failed: {e}")
+            return None
+
+    def parse_initial_state(self, state_json):
+        """Parse the server-rendered first page of results (__PWS_INITIAL_PROPS__ / __PWS_DATA__)"""
+        if not state_json:
+            return []
+        try:
+            pins = self.parse_payload(json.loads(state_json))
+        except Exception as e:
+            self.stats['parse_errors'] += 1
+            self.logger.debug(f"Could not parse initial page state: {e}")
+            return []
+        self.stats['pins_parsed'] += len(pins)
+        return pins
+
+    def parse_payload(self, payload):
+        """Walk a feed payload and return one metadata dict per pin, in feed order"""
+        pins = []
+        stack = [payload]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                if self._looks_like_pin(node):
+                    pins.append(self._pin_metadata(node))
+                else:
+                    stack.extend(reversed(list(node.values())))
+        return pins
+
+    @staticmethod
+    def _looks_like_pin(node):
+        return (
+            isinstance(node.get('images'), dict)
+            and str(node.get('id', '')).isdigit()
+            and node.get('type', 'pin') == 'pin'
+        )
+
+    def _pin_metadata(self, node):
+        pin_id = str(node['id'])
+        image_urls = {
+            size: image['url']
+            for size, image in node['images'].items()
+            if isinstance(image, dict) and image.get('url')
+        }
+        best_size = next((size for size in self.IMAGE_SIZES if size in image_urls), None)
+        best = node['images'].get(best_size, {}) if best_size else {}
+
+        return {
+            'id': pin_id,
+            'url': f"https://www.pinterest.com/pin/{pin_id}/",
+            'title': node.get('grid_title') or node.get('title') or '',
+            'description': node.get('description') or '',
+            'alt': node.get('auto_alt_text') or node.get('alt_text') or '',
+            'image_urls': image_urls,
+            'image_url': best.get('url'),
+            'width': best.get('width'),
+            'height': best.get('height'),
+            'source': 'feed'
+        }
+
+class PinPageMetaParser(HTMLParser):
+    """Streaming parser for the Open Graph tags of a pin page.
+
+    Fed chunk by chunk; `done` turns True once </head> (or <body>) is reached, so
+    the caller can stop reading the rest of the page.
+    """
+
+    WANTED = {
+        'og:image': 'image_url',
+        'og:title': 'title',
+        'og:description': 'description',
+        'description': 'description'
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            key = self.WANTED.get(attrs.get('property') or attrs.get('name'))
+            if key and attrs.get('content') and key not in self.meta:
+                self.meta[key] = attrs['content']
+        elif tag == 'body':
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.done = True
+
+class ScrollPacer:
+    """Paces grid scrolling on real page signals instead of fixed sleeps.
+
+    Each scroll waits until the grid grows (or a timeout derived from the observed
+    load latency expires), then until the page's pending requests drain. Scroll
+    distance and timeouts adapt to how fast Pinterest answers. The time actually
+    waited is compared with the fixed sleep schedule the collectors used before,
+    so every run can report what it saved.
+    """
+
+    # All Pinterest grid selectors raced as one CSS selector list
+    GRID_SELECTORS = [
+        "div[data-test-id='pin']",
+        "div[data-test-id='pinWrapper']",
+        "div[role='button']",
+        "img[alt]",
+        "a[href*='/pin/']"
+    ]
+    GRID_COUNT_JS = """() => window.__pinHarvest ? window.__pinHarvest.total : document.querySelectorAll("a[href^='/pin/']").length"""
+    GRID_GROWTH_JS = """(n) => (window.__pinHarvest ? window.__pinHarvest.total : document.querySelectorAll("a[href^='/pin/']").length) > n"""
+    SCROLL_TO_END_JS = "() => window.scrollTo(0, document.body.scrollHeight)"
+
+    def __init__(self, logger, scroll_distance=5000, min_distance=2000, max_distance=12000, max_idle_scrolls=4):
+        self.logger = logger
+        self.scroll_distance = scroll_distance
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self.max_idle_scrolls = max_idle_scrolls
+
+        # Smoothed seconds between a scroll and the grid growing
+        self.latency = 1.5
+        self.stats = {
+            'scrolls': 0,
+            'scrolls_with_growth': 0,
+            'growth_timeouts': 0,
+            'seconds_waited': 0.0,
+            'fixed_schedule_seconds': 0.0,
+            'fast_forward_scrolls': 0
+        }
+
+    @property
+    def growth_timeout(self):
+        """Seconds to wait for new grid items - three times the observed latency, within 1.5-8 s"""
+        return min(8.0, max(1.5, self.latency * 3))
+
+    @property
+    def seconds_saved(self):
+        return self.stats['fixed_schedule_seconds'] - self.stats['seconds_waited']
+
+    def attach(self, page):
+        """Track the page's pending request count (call before goto)"""
+        tracker = {'pending': 0}
+
+        def on_request(request):
+            tracker['pending'] += 1
+
+        def on_request_done(request):
+            tracker['pending'] = max(0, tracker['pending'] - 1)
+
+        page.on("request", on_request)
+        page.on("requestfinished", on_request_done)
+        page.on("requestfailed", on_request_done)
+        return tracker
+
+    def _record(self, elapsed, grew, fixed_delay):
+        self.stats['scrolls'] += 1
+        self.stats['seconds_waited'] += elapsed
+        self.stats['fixed_schedule_seconds'] += fixed_delay
+
+        if grew:
+            self.stats['scrolls_with_growth'] += 1
+            self.latency = 0.7 * self.latency + 0.3 * elapsed
+            # Content arrives quickly - cover more of the feed per scroll
+            if elapsed < self.latency * 1.2:
+                self.scroll_distance = min(self.max_distance, int(self.scroll_distance * 1.25))
+        else:
+            self.stats['growth_timeouts'] += 1
+            # Nothing arrived in time - scroll less and give the next one longer
+            self.scroll_distance = max(self.min_distance, int(self.scroll_distance * 0.75))
+            self.latency = min(8.0, self.latency * 1.25)
+
+        self.logger.debug(
+            f"Scroll paced in {elapsed:.2f}s (grew: {grew}), next distance {self.scroll_distance}px, "
+            f"growth timeout {self.growth_timeout:.1f}s"
+        )
+
+    def scroll(self, page, tracker, fixed_delay=4, harvester=None):
+        """Scroll once and wait for new content; returns True if the grid grew.
+
+        In xhr mode (harvester given) new content is the next feed response: without the
+        DOM harvester the virtualized grid's anchor count stops growing as nodes recycle.
+        """
+        start = time.monotonic()
+        if harvester is not None:
+            baseline = harvester.responses_seen
+            page.mouse.wheel(0, self.scroll_distance)
+            deadline = start + self.growth_timeout
+            # page.wait_for_timeout keeps Playwright's event loop running so responses arrive
+            while harvester.responses_seen <= baseline and time.monotonic() < deadline:
+                page.wait_for_timeout(100)
+            grew = harvester.responses_seen > baseline
+        else:
+            baseline = page.evaluate(self.GRID_COUNT_JS)
+            page.mouse.wheel(0, self.scroll_distance)
+
+            grew = True
+            try:
+                page.wait_for_function(self.GRID_GROWTH_JS, arg=baseline, timeout=self.growth_timeout * 1000, polling=100)
+            except Exception:
+                grew = False
+
+        self.wait_for_requests(page, tracker, max_wait=self.growth_timeout)
+        self._record(time.monotonic() - start, grew, fixed_delay)
+        return grew
+
+    def fast_forward(self, page, pins, max_scrolls=60):
+        """Jump to the end of the grid until `pins` pins are harvested, waiting only for it to grow.
+
+        Needs the pin harvester installed first; returns how many pins the page has reached.
+        """
+        count = page.evaluate(self.GRID_COUNT_JS)
+        for _ in range(max_scrolls):
+            if count >= pins:
+                break
+            page.evaluate(self.SCROLL_TO_END_JS)
+            try:
+                page.wait_for_function(self.GRID_GROWTH_JS, arg=count, timeout=self.growth_timeout * 1000, polling=100)
+            except Exception:
+                break
+            self.stats['fast_forward_scrolls'] += 1
+            count = page.evaluate(self.GRID_COUNT_JS)
+        return min(count, pins)
+
+    async def fast_forward_async(self, page, pins, max_scrolls=60):
+        """Async counterpart of fast_forward"""
+        count = await page.evaluate(self.GRID_COUNT_JS)
+        for _ in range(max_scrolls):
+            if count >= pins:
+                break
+            await page.evaluate(self.SCROLL_TO_END_JS)
+            try:
+                await page.wait_for_function(self.GRID_GROWTH_JS, arg=count, timeout=self.growth_timeout * 1000, polling=100)
+            except Exception:
+                break
+            self.stats['fast_forward_scrolls'] += 1
+            count = await page.evaluate(self.GRID_COUNT_JS)
+        return min(count, pins)
+
+    def wait_for_requests(self, page, tracker, max_wait=3.0):
+        """Wait until the page has no pending requests, up to max_wait seconds"""
+        deadline = time.monotonic() + max_wait
+        # page.wait_for_timeout keeps Playwright's event loop running so the tracker updates
+        while tracker['pending'] > 0 and time.monotonic() < deadline:
+            page.wait_for_timeout(100)
+
+    def wait_for_grid(self, page, tracker, fixed_delay=5):
+        """Race all grid selectors at once, then let pending requests settle"""
+        start = time.monotonic()
+        found = True
+        try:
+            page.wait_for_selector(", ".join(self.GRID_SELECTORS), state="attached", timeout=15000)
+        except Exception as e:
+            found = False
+            self.logger.debug(f"No grid selector matched: {e}")
+
+        if tracker is not None:
+            self.wait_for_requests(page, tracker, max_wait=self.growth_timeout)
+        self.stats['seconds_waited'] += time.monotonic() - start
+        self.stats['fixed_schedule_seconds'] += fixed_delay
+        return found
+
+    async def scroll_async(self, page, tracker, fixed_delay=4, harvester=None):
+        """Async counterpart of scroll"""
+        start = time.monotonic()
+        if harvester is not None:
+            baseline = harvester.responses_seen
+            await page.mouse.wheel(0, self.scroll_distance)
+            deadline = start + self.growth_timeout
+            while harvester.responses_seen <= baseline and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+            grew = harvester.responses_seen > baseline
+        else:
+            baseline = await page.evaluate(self.GRID_COUNT_JS)
+            await page.mouse.wheel(0, self.scroll_distance)
+
+            grew = True
+            try:
+                await page.wait_for_function(self.GRID_GROWTH_JS, arg=baseline, timeout=self.growth_timeout * 1000, polling=100)
+            except Exception:
+                grew = False
+
+        await self.wait_for_requests_async(tracker, max_wait=self.growth_timeout)
+        self._record(time.monotonic() - start, grew, fixed_delay)
+        return grew
+
+    async def wait_for_requests_async(self, tracker, max_wait=3.0):
+        """Async counterpart of wait_for_requests"""
+        deadline = time.monotonic() + max_wait
+        while tracker['pending'] > 0 and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+    async def wait_for_grid_async(self, page, tracker, fixed_delay=5):
+        """Async counterpart of wait_for_grid"""
+        start = time.monotonic()
+        found = True
+        try:
+            await page.wait_for_selector(", ".join(self.GRID_SELECTORS), state="attached", timeout=15000)
+        except Exception as e:
+            found = False
+            self.logger.debug(f"No grid selector matched: {e}")
+
+        if tracker is not None:
+            await self.wait_for_requests_async(tracker, max_wait=self.growth_timeout)
+        self.stats['seconds_waited'] += time.monotonic() - start
+        self.stats['fixed_schedule_seconds'] += fixed_delay
+        return found
+
+    def log_stats(self):
+        """Log scroll counters and time saved versus the fixed sleep schedule"""
+        self.logger.info(
+            f"Scrolls: {self.stats['scrolls']} ({self.stats['scrolls_with_growth']} with new content, "
+            f"{self.stats['growth_timeouts']} timed out)"
+        )
+        self.logger.info(
+            f"Scroll pacing waited {self.stats['seconds_waited']:.1f}s vs {self.stats['fixed_schedule_seconds']:.1f}s "
+            f"fixed schedule - saved {self.seconds_saved:.1f}s"
+        )
+        if self.stats['fast_forward_scrolls']:
+            self.logger.info(f"Fast-forwarded {self.stats['fast_forward_scrolls']} scrolls past already harvested pins")
+
+class ResourceRoutePolicy:
+    """Per-phase `page.route` policy with request/byte counters.
+
+    Discovery pages only need pin links, so by default they abort images, media,
+    fonts and third-party trackers. Download-phase pages keep full fidelity.
+    Counters are kept per phase to measure the bandwidth saved.
+
+    Playwright disables the HTTP cache on any page with routing, so with
+    `keep_cache` (persistent profiles) the same resources are blocked by URL
+    pattern through CDP `Network.setBlockedURLs` instead, and the warm disk
+    cache keeps serving the scripts and styles that do load.
+    """
+
+    TRACKER_HOSTS = (
+        'google-analytics.com',
+        'googletagmanager.com',
+        'doubleclick.net',
+        'googlesyndication.com',
+        'facebook.net',
+        'scorecardresearch.com',
+        'quantserve.com',
+        'ct.pinterest.com',
+        'trk.pinterest.com'
+    )
+    DEFAULT_PHASES = {
+        'discovery': {'block_types': {'image', 'media', 'font'}, 'block_trackers': True},
+        'download': {'block_types': set(), 'block_trackers': False}
+    }
+    # URL patterns standing in for resource types when blocking through CDP
+    TYPE_URL_PATTERNS = {
+        'image': ['*://i.pinimg.com/*', '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.svg*', '*.ico*'],
+        'media': ['*://v.pinimg.com/*', '*://v1.pinimg.com/*', '*.mp4*', '*.m3u8*', '*.webm*'],
+        'font': ['*.woff*', '*.ttf*', '*.otf*']
+    }
+    BLOCKED_BY_CLIENT = 'net::ERR_BLOCKED_BY_CLIENT'
+
+    def __init__(self, logger, phases=None, keep_cache=False):
+        self.logger = logger
+        self.phases = phases or self.DEFAULT_PHASES
+        self.keep_cache = keep_cache
+        self.stats = {
+            phase: {'requests': 0, 'blocked': 0, 'bytes': 0}
+            for phase in self.phases
+        }
+
+    def _should_block(self, phase, request):
+        rules = self.phases[phase]
+        if request.resource_type in rules['block_types']:
+            return True
+        if rules['block_trackers']:
+            host = urllib.parse.urlparse(request.url).hostname or ''
+            return any(host == tracker or host.endswith('.' + tracker) for tracker in self.TRACKER_HOSTS)
+        return False
+
+    def _count_response(self, phase, response):
+        try:
+            self.stats[phase]['bytes'] += int(response.headers.get('content-length', 0))
+        except ValueError:
+            pass
+
+    def _needs_route(self, phase):
+        rules = self.phases[phase]
+        return bool(rules['block_types']) or rules['block_trackers']
+
+    def blocked_url_patterns(self, phase):
+        """Network.setBlockedURLs patterns equivalent to the phase's rules"""
+        rules = self.phases[phase]
+        patterns = [pattern for resource_type in sorted(rules['block_types'])
+                    for pattern in self.TYPE_URL_PATTERNS.get(resource_type, [])]
+        if rules['block_trackers']:
+            for tracker in self.TRACKER_HOSTS:
+                patterns += [f'*://{tracker}/*', f'*://*.{tracker}/*']
+        return patterns
+
+    def _count_requests(self, page, stats):
+        """Count requests, and the ones CDP blocked, without routing"""
+        page.on("request", lambda request: stats.__setitem__('requests', stats['requests'] + 1))
+        page.on("requestfailed", lambda request: stats.__setitem__(
+            'blocked', stats['blocked'] + (1 if request.failure == self.BLOCKED_BY_CLIENT else 0)))
+
+    def apply(self, page, phase):
+        """Install the phase's routing and counters on a sync page (call before goto)"""
+        stats = self.stats[phase]
+
+        def handle_route(route):
+            stats['requests'] += 1
+            if self._should_block(phase, route.request):
+                stats['blocked'] += 1
+                route.abort()
+            else:
+                route.continue_()
+
+        if not self._needs_route(phase):
+            self._count_requests(page, stats)
+        elif self.keep_cache and self._block_with_cdp(page, phase):
+            self._count_requests(page, stats)
+        else:
+            page.route("**/*", handle_route)
+        page.on("response", lambda response: self._count_response(phase, response))
+
+    def _block_with_cdp(self, page, phase):
+        try:
+            cdp_session = page.context.new_cdp_session(page)
+            cdp_session.send("Network.enable")
+            cdp_session.send("Network.setBlockedURLs", {"urls": self.blocked_url_patterns(phase)})
+            return True
+        except Exception as e:
+            self.logger.debug(f"CDP URL blocking unavailable ({e}) - routing instead, without the disk cache")
+            return False
+
+    async def apply_async(self, page, phase):
+        """Async counterpart of apply"""
+        stats = self.stats[phase]
+
+        async def handle_route(route):
+            stats['requests'] += 1
+            if self._should_block(phase, route.request):
+                stats['blocked'] += 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        if not self._needs_route(phase):
+            self._count_requests(page, stats)
+        elif self.keep_cache and await self._block_with_cdp_async(page, phase):
+            self._count_requests(page, stats)
+        else:
+            await page.route("**/*", handle_route)
+        page.on("response", lambda response: self._count_response(phase, response))
+
+    async def _block_with_cdp_async(self, page, phase):
+        try:
+            cdp_session = await page.context.new_cdp_session(page)
+            await cdp_session.send("Network.enable")
+            await cdp_session.send("Network.setBlockedURLs", {"urls": self.blocked_url_patterns(phase)})
+            return True
+        except Exception as e:
+            self.logger.debug(f"CDP URL blocking unavailable ({e}) - routing instead, without the disk cache")
+            return False
+
+    def log_stats(self):
+        """Log request, blocked and byte counters per phase"""
+        for phase, stats in self.stats.items():
+            if stats['requests']:
+                self.logger.info(
+                    f"{phase.capitalize()} phase: {stats['requests']} requests, {stats['blocked']} blocked, "
+                    f"{stats['bytes'] / (1024 * 1024):.1f} MB received"
+                )
+
+class MemoryGovernor:
+    """Keeps long crawls inside a memory budget.
+
+    Every `sample_every` scrolls a pin page's JS heap is read through CDP
+    `Performance.getMetrics`; once it crosses `heap_limit_mb` the page is reloaded
+    on a fresh context and brought back to the depth it had reached (feed bookmark
+    or fast-forward). Pins collected, seen ids and the scroll count live in Python,
+    so the harvest carries over. With psutil installed the RSS of the browser
+    processes is sampled too, and the async expander only opens another page while
+    the estimated cost of one more page still fits `memory_budget_mb`.
+    """
+
+    def __init__(self, logger, heap_limit_mb=384, memory_budget_mb=4096, sample_every=5):
+        self.logger = logger
+        self.heap_limit_mb = heap_limit_mb
+        self.memory_budget_mb = memory_budget_mb
+        self.sample_every = sample_every
+        # Running estimate of what one open pin page costs in browser RSS
+        self.page_cost_mb = 250.0
+
+        self.stats = {
+            'heap_samples': 0,
+            'peak_heap_mb': 0.0,
+            'peak_rss_mb': 0.0,
+            'recycles': 0,
+            'throttled_waits': 0
+        }
+
+    def due(self, scroll_count):
+        return scroll_count % self.sample_every == 0
+
+    def _heap_from_metrics(self, result):
+        metrics = {metric['name']: metric['value'] for metric in result.get('metrics', [])}
+        heap_mb = metrics.get('JSHeapUsedSize', 0) / (1024 * 1024)
+        self.stats['heap_samples'] += 1
+        self.stats['peak_heap_mb'] = max(self.stats['peak_heap_mb'], heap_mb)
+        return heap_mb
+
+    def js_heap_mb(self, page):
+        """Used JS heap of a page in MB (0 if CDP is unavailable)"""
+        try:
+            cdp_session = page.context.new_cdp_session(page)
+            cdp_session.send("Performance.enable")
+            heap_mb = self._heap_from_metrics(cdp_session.send("Performance.getMetrics"))
+            cdp_session.detach()
+            return heap_mb
+        except Exception as e:
+            self.logger.debug(f"Could not sample JS heap: {e}")
+            return 0.0
+
+    async def js_heap_mb_async(self, page):
+        try:
+            cdp_session = await page.context.new_cdp_session(page)
+            await cdp_session.send("Performance.enable")
+            heap_mb = self._heap_from_metrics(await cdp_session.send("Performance.getMetrics"))
+            await cdp_session.detach()
+            return heap_mb
+        except Exception as e:
+            self.logger.debug(f"Could not sample JS heap: {e}")
+            return 0.0
+
+    def needs_recycle(self, heap_mb, pin_id):
+        if heap_mb <= self.heap_limit_mb:
+            return False
+        self.stats['recycles'] += 1
+        self.logger.info(f"JS heap {heap_mb:.0f} MB on pin page {pin_id} exceeds {self.heap_limit_mb} MB - reloading on a fresh context")
+        return True
+
+    def browser_rss_mb(self):
+        """RSS of every process this scraper started (Playwright driver + Chromium), None without psutil"""
+        if psutil is None:
+            return None
+        total = 0
+        try:
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+        except psutil.Error:
+            return None
+        rss_mb = total / (1024 * 1024)
+        self.stats['peak_rss_mb'] = max(self.stats['peak_rss_mb'], rss_mb)
+        return rss_mb
+
+    def allowed_pages(self, requested, in_flight):
+        """How many pin pages may be open at once given current browser RSS"""
+        rss_mb = self.browser_rss_mb()
+        if rss_mb is None or in_flight == 0:
+            return requested
+
+        self.page_cost_mb = 0.8 * self.page_cost_mb + 0.2 * (rss_mb / in_flight)
+        headroom = self.memory_budget_mb - rss_mb
+        return max(1, min(requested, in_flight + int(headroom // self.page_cost_mb)))
+
+    def log_stats(self):
+        if not self.stats['heap_samples']:
+            return
+        self.logger.info(f"Memory governor: peak JS heap {self.stats['peak_heap_mb']:.0f} MB, {self.stats['recycles']} context recycles, {self.stats['throttled_waits']} throttled page opens")
+        if self.stats['peak_rss_mb']:
+            self.logger.info(f"Peak browser RSS: {self.stats['peak_rss_mb']:.0f} MB of {self.memory_budget_mb} MB budget")
+
+class HostRequest:
+    """Handle for one request inside HostLimiter.slot - record() the response once it arrives"""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.status = None
+        self.headers = {}
+        self.latency = None
+
+    def record(self, response):
+        """Take status and headers from a requests or Playwright response"""
+        if response is None:
+            return
+        self.latency = time.monotonic() - self.start
+        self.status = getattr(response, 'status_code', None) or getattr(response, 'status', None)
+        self.headers = response.headers or {}
+
+class HostLimiter:
+    """Per-host AIMD rate controller - the politeness layer of every HTTP request.
+
+    Each host has a concurrency limit and a spacing between request starts. Fast
+    healthy responses raise the limit additively (about +1 per `limit` successes)
+    and shrink the spacing; 429/5xx and requests that got no response at all
+    (network errors, browser timeouts) halve the limit and double the spacing,
+    and a Retry-After header pauses the host as long as the server asks. A
+    response far slower than the host's smoothed latency counts as mild
+    congestion. The limits configured per host are upper bounds; `limits()`
+    shows where each host currently is.
+    """
+
+    DEFAULT_LIMITS = {
+        'i.pinimg.com': 8,
+        'www.pinterest.com': 2
+    }
+    OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, limits=None, default_limit=4, initial_limit=2, max_spacing=30.0, max_retry_after=300):
+        self.max_limits = dict(self.DEFAULT_LIMITS, **(limits or {}))
+        self.default_limit = default_limit
+        self.initial_limit = initial_limit
+        self.max_spacing = max_spacing
+        self.max_retry_after = max_retry_after
+        self.condition = threading.Condition()
+        self.hosts = {}
+        self.stats = {'requests': 0, 'waits': 0, 'backoffs': 0, 'retry_after_pauses': 0, 'peak_active': {}}
+
+    def _host(self, host):
+        if host not in self.hosts:
+            max_limit = self.max_limits.get(host, self.default_limit)
+            self.hosts[host] = {
+                'limit': float(min(self.initial_limit, max_limit)),
+                'max_limit': max_limit,
+                'spacing': 0.0,
+                'next_start': 0.0,
+                'paused_until': 0.0,
+                'active': 0,
+                'latency': None
+            }
+        return self.hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        """Wait for the host's turn, then hold one of its slots for the duration of a request"""
+        host = urllib.parse.urlsplit(url).netloc
+        with self.condition:
+            state = self._host(host)
+            waited = False
+            while True:
+                now = time.monotonic()
+                ready_at = max(state['next_start'], state['paused_until'])
+                if state['active'] < int(state['limit']) and now >= ready_at:
+                    break
+                waited = True
+                self.condition.wait(timeout=ready_at - now if now < ready_at else 1.0)
+
+            self.stats['requests'] += 1
+            self.stats['waits'] += waited
+            state['active'] += 1
+            state['next_start'] = now + state['spacing']
+            self.stats['peak_active'][host] = max(self.stats['peak_active'].get(host, 0), state['active'])
+
+        request = HostRequest()
+        failed = False
+        try:
+            yield request
+        except Exception:
+            # No response at all (network error, Playwright timeout, failed navigation) counts as overload
+            failed = request.status is None
+            raise
+        finally:
+            with self.condition:
+                state['active'] -= 1
+                if failed or request.status is not None:
+                    self._adjust(state, request, failed)
+                self.condition.notify_all()
+
+    def _adjust(self, state, request, failed):
+        """Additive increase on healthy responses, multiplicative decrease on overload"""
+        if failed or request.status in self.OVERLOAD_STATUSES:
+            self.stats['backoffs'] += 1
+            state['limit'] = max(1.0, state['limit'] / 2)
+            state['spacing'] = min(self.max_spacing, max(state['spacing'] * 2, 0.25))
+            retry_after = self.retry_after_seconds(request.headers)
+            if retry_after:
+                self.stats['retry_after_pauses'] += 1
+                state['paused_until'] = max(state['paused_until'], time.monotonic() + min(retry_after, self.max_retry_after))
+            return
+
+        latency = request.latency
+        if state['latency'] is not None and latency > 3 * state['latency'] and latency > 1.0:
+            state['limit'] = max(1.0, state['limit'] * 0.9)
+        else:
+            state['limit'] = min(float(state['max_limit']), state['limit'] + 1 / state['limit'])
+            state['spacing'] = state['spacing'] * 0.8 if state['spacing'] > 0.01 else 0.0
+        state['latency'] = latency if state['latency'] is None else 0.8 * state['latency'] + 0.2 * latency
+
+    @staticmethod
+    def retry_after_seconds(headers):
+        """Retry-After as seconds (delta-seconds or HTTP date), None if absent"""
+        value = headers.get('Retry-After') or headers.get('retry-after') if headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def limits(self):
+        """Current per-host state: concurrency limit, spacing between starts, active requests, pause left"""
+        with self.condition:
+            now = time.monotonic()
+            return {
+                host: {
+                    'limit': int(state['limit']),
+                    'max_limit': state['max_limit'],
+                    'spacing': round(state['spacing'], 2),
+                    'active': state['active'],
+                    'paused_for': round(max(0.0, state['paused_until'] - now), 1)
+                }
+                for host, state in self.hosts.items()
+            }
+
+    def describe(self):
+        return ", ".join(
+            f"{host} {state['limit']}/{state['max_limit']} (+{state['spacing']}s)"
+            for host, state in sorted(self.limits().items())
+        )
+
+    def log_stats(self, logger):
+        if not self.stats['requests']:
+            return
+        peaks = ", ".join(f"{host} {peak}" for host, peak in sorted(self.stats['peak_active'].items()))
+        logger.info(f"Host limiter: {self.stats['requests']} requests, {self.stats['waits']} waited for a slot, "
+                    f"{self.stats['backoffs']} backoffs ({self.stats['retry_after_pauses']} Retry-After pauses), peak per host: {peaks}")
+        logger.info(f"Host limits now: {self.describe()}")
+
+class DownloadFailure(Exception):
+    """A classified download failure - `kind` decides whether retrying can help"""
+
+    RETRYABLE_KINDS = {'timeout', 'server', 'network', 'decode', 'no_image_url', 'circuit_open'}
+    # 4xx that mean "not now" rather than "never"
+    RETRYABLE_STATUSES = {408, 429}
+
+    def __init__(self, kind, message, status=None, host=None):
+        super().__init__(message)
+        self.kind = kind
+        self.status = status
+        self.host = host
+
+    @property
+    def retryable(self):
+        return self.kind in self.RETRYABLE_KINDS or self.status in self.RETRYABLE_STATUSES
+
+    @property
+    def counts_against_host(self):
+        """Failures that say the host is in trouble, not just this one image"""
+        return self.kind in ('timeout', 'server', 'network') or self.status == 429
+
+    @classmethod
+    def classify(cls, error, host=None):
+        """timeout / client (4xx) / server (5xx) / decode / network / other"""
+        if isinstance(error, cls):
+            error.host = error.host or host
+            return error
+        if isinstance(error, requests.Timeout):
+            return cls('timeout', str(error), host=host)
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return cls('server' if status >= 500 else 'client', str(error), status, host)
+        if isinstance(error, (requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)):
+            return cls('decode', str(error), host=host)
+        if isinstance(error, requests.ConnectionError):
+            return cls('network', str(error), host=host)
+        return cls('other', str(error), host=host)
+
+class CircuitBreaker:
+    """Per-host circuit breaker for image downloads.
+
+    After `failure_threshold` consecutive host-level failures (timeouts, 5xx,
+    429, connection errors) the circuit opens and downloads from that host fail
+    fast for `cooldown` seconds. Then one trial request is let through: success
+    closes the circuit, failure reopens it with a doubled cooldown.
+    """
+
+    def __init__(self, logger, failure_threshold=5, cooldown=30.0, max_cooldown=600.0):
+        self.logger = logger
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.stats = {'opened': 0, 'rejected': 0}
+
+    def _host(self, host):
+        return self.hosts.setdefault(host, {
+            'state': 'closed',
+            'failures': 0,
+            'open_until': 0.0,
+            'cooldown': self.cooldown,
+            'trial_running': False
+        })
+
+    def allow(self, host):
+        """May a request to host go out now?"""
+        with self.lock:
+            state = self._host(host)
+            if state['state'] == 'open' and time.monotonic() >= state['open_until']:
+                state['state'] = 'half_open'
+                state['trial_running'] = False
+            if state['state'] == 'closed':
+                return True
+            if state['state'] == 'half_open' and not state['trial_running']:
+                state['trial_running'] = True
+                return True
+            self.stats['rejected'] += 1
+            return False
+
+    def retry_in(self, host):
+        """Seconds until host's circuit lets a trial request through"""
+        with self.lock:
+            return max(0.0, self._host(host)['open_until'] - time.monotonic())
+
+    def record(self, host, healthy):
+        with self.lock:
+            state = self._host(host)
+            if healthy:
+                if state['state'] != 'closed':
+                    self.logger.info(f"Circuit for {host} closed again")
+                state.update(state='closed', failures=0, cooldown=self.cooldown, trial_running=False)
+                return
+
+            state['failures'] += 1
+            if state['state'] == 'half_open':
+                state['cooldown'] = min(self.max_cooldown, state['cooldown'] * 2)
+            elif state['failures'] < self.failure_threshold:
+                return
+            state.update(state='open', open_until=time.monotonic() + state['cooldown'], trial_running=False)
+            self.stats['opened'] += 1
+            self.logger.warning(f"Circuit for {host} opened after {state['failures']} failures - pausing it {state['cooldown']:.0f}s")
+
+    def log_stats(self):
+        if self.stats['opened']:
+            self.logger.info(f"Circuit breaker: opened {self.stats['opened']} times, {self.stats['rejected']} downloads failed fast")
+
+class RetryQueue:
+    """Delayed requeue of failed downloads, and the dead-letter file behind it.
+
+    A retryable failure puts the pin back after an exponential backoff with
+    jitter (base_delay * 2^attempt, randomized over its upper half so retries
+    don't arrive in lockstep). Pins that fail for good or run out of attempts
+    are appended to a JSONL dead-letter file with their image URL, so
+    --replay-dead-letters retries them later without crawling anything.
+    Rejections by an open circuit don't use up attempts, but a pin that keeps
+    meeting an open circuit for `max_circuit_wait` seconds is dead-lettered as
+    circuit_open, so a host outage can't keep a download stage waiting for hours.
+    """
+
+    def __init__(self, dead_letter_path, logger, max_attempts=4, base_delay=2.0, max_delay=120.0,
+                 max_circuit_wait=900.0):
+        self.dead_letter_path = dead_letter_path
+        self.logger = logger
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_circuit_wait = max_circuit_wait
+        self.lock = threading.Lock()
+        # (ready_at, seq, pin_url, keyword)
+        self.heap = []
+        self.counter = itertools.count()
+        self.scheduled = set()
+        self.attempts = {}
+        # When each pin first met an open circuit
+        self.circuit_waits = {}
+        self.stats = {'retries': 0, 'recovered': 0, 'dead_lettered': 0}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def is_scheduled(self, pin_url):
+        return pin_url in self.scheduled
+
+    def failed(self, pin_url, keyword, failure, image_url=None, not_before=0.0):
+        """Requeue a failed pin or dead-letter it; returns the retry delay, None if dead-lettered"""
+        with self.lock:
+            attempt = self.attempts.get(pin_url, 0)
+            if failure.kind == 'circuit_open':
+                # Failing fast on an open circuit doesn't use up an attempt, but the wait is bounded
+                first_rejected = self.circuit_waits.setdefault(pin_url, time.monotonic())
+                exhausted = time.monotonic() - first_rejected >= self.max_circuit_wait
+            else:
+                attempt += 1
+                exhausted = attempt >= self.max_attempts
+            self.attempts[pin_url] = attempt
+
+            if failure.retryable and not exhausted:
+                backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+                delay = max(not_before, backoff / 2 + random.uniform(0, backoff / 2))
+                heapq.heappush(self.heap, (time.monotonic() + delay, next(self.counter), pin_url, keyword))
+                self.scheduled.add(pin_url)
+                self.stats['retries'] += 1
+                return delay
+
+            self.attempts.pop(pin_url, None)
+            self.circuit_waits.pop(pin_url, None)
+            self.stats['dead_lettered'] += 1
+            record = {
+                'pin_url': pin_url,
+                'keyword': keyword,
+                'image_url': image_url,
+                'kind': failure.kind,
+                'status': failure.status,
+                'error': str(failure)[:300],
+                'attempts': attempt,
+                'failed_at': datetime.now().isoformat(timespec='seconds')
+            }
+            try:
+                with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                self.logger.error(f"Could not write dead letter for {pin_url}: {e}")
+            return None
+
+    def succeeded(self, pin_url):
+        with self.lock:
+            waited = self.circuit_waits.pop(pin_url, None)
+            if self.attempts.pop(pin_url, None) or waited:
+                self.stats['recovered'] += 1
+
+    def pop_ready(self):
+        """(pin_url, keyword) of a retry that is due, else None"""
+        with self.lock:
+            if not self.heap or self.heap[0][0] > time.monotonic():
+                return None
+            _, _, pin_url, keyword = heapq.heappop(self.heap)
+            self.scheduled.discard(pin_url)
+            return pin_url, keyword
+
+    def next_ready_in(self):
+        """Seconds until the next retry is due (None if nothing is queued)"""
+        with self.lock:
+            return max(0.0, self.heap[0][0] - time.monotonic()) if self.heap else None
+
+    def take_dead_letters(self):
+        """Move the dead letters aside for a replay and return them (latest record per pin).
+
+        Pins failing again during the replay land in a fresh dead-letter file; the
+        moved-aside copy is dropped by finish_replay and merged back in if a replay
+        was interrupted.
+        """
+        replay_path = f"{self.dead_letter_path}.replaying"
+        records = {}
+        for path in (replay_path, self.dead_letter_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of a killed run
+                    records[record['pin_url']] = record
+
+        if records:
+            temp_path = f"{replay_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(record) + "\n" for record in records.values())
+            os.replace(temp_path, replay_path)
+        if os.path.exists(self.dead_letter_path):
+            os.remove(self.dead_letter_path)
+        return list(records.values())
+
+    def finish_replay(self):
+        replay_path = f"{self.dead_letter_path}.replaying"
+        if os.path.exists(replay_path):
+            os.remove(replay_path)
+
+    def log_stats(self):
+        if self.stats['retries'] or self.stats['dead_lettered']:
+            self.logger.info(f"Retries: {self.stats['retries']} scheduled, {self.stats['recovered']} pins recovered, "
+                             f"{self.stats['dead_lettered']} dead-lettered to {self.dead_letter_path}")
+
+class DownloadEngine:
+    """Sliding-window download stage.
+
+    Keeps up to `max_in_flight` pins downloading at once and starts the next pin
+    the moment any of them finishes, so one slow image never idles the others.
+    Every request still goes through the scraper's HostLimiter, which is what
+    bounds the load on i.pinimg.com however large the window is. Failed pins
+    that the RetryQueue backs off are fed back into the window once due, and
+    run() returns only when none are left.
+    """
+
+    def __init__(self, scraper, max_in_flight=8):
+        self.scraper = scraper
+        self.logger = scraper.logger
+        self.max_in_flight = max_in_flight
+        self.stats = {'peak_in_flight': 0}
+
+    def run(self, pin_urls, keyword=None):
+        """Download pin_urls plus queued retries; returns the number of successful downloads"""
+        scraper = self.scraper
+        retry_queue = scraper.retry_queue
+        total = len(pin_urls)
+        remaining = iter(enumerate(pin_urls, 1))
+        in_flight = {}
+        finished = succeeded = 0
+        start = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="PinDownload")
+
+        def submit(pin_url, pin_id, pin_keyword):
+            scraper.checkpoint.start_download(pin_keyword, pin_url)
+            in_flight[executor.submit(scraper.download_image, pin_url, pin_keyword)] = (pin_url, pin_id, pin_keyword)
+
+        def submit_next():
+            retry = retry_queue.pop_ready()
+            if retry:
+                pin_url, pin_keyword = retry
+                submit(pin_url, scraper.extract_pin_id_from_url(pin_url), pin_keyword)
+                return True
+            for i, pin_url in remaining:
+                pin_id = scraper.extract_pin_id_from_url(pin_url)
+                if scraper.is_pin_already_processed(pin_id):
+                    print(f"⏭️  [{i}/{total}] Skipped duplicate: {pin_id}")
+                    scraper.stats['skipped_duplicates'] += 1
+                    scraper.forget_processed_pin(keyword, pin_url, pin_id)
+                    continue
+                submit(pin_url, pin_id, keyword)
+                return True
+            return False
+
+        try:
+            while True:
+                # Refill the window: due retries first, then new pins
+                while len(in_flight) < self.max_in_flight and submit_next():
+                    pass
+                if not in_flight:
+                    if not retry_queue:
+                        break
+                    # Only backed-off retries left - sleep until the first one is due
+                    time.sleep(retry_queue.next_ready_in())
+                    continue
+
+                self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], len(in_flight))
+                # With a free slot, also wake up when the next retry comes due
+                timeout = retry_queue.next_ready_in() if len(in_flight) < self.max_in_flight else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pin_url, pin_id, pin_keyword = in_flight.pop(future)
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Download worker crashed on pin {pin_id}: {e}")
+                        success = False
+                    # Pending is cleared by the commit callback once the file is durable
+                    scraper.checkpoint.end_attempt(pin_keyword, pin_url)
+
+                    finished += 1
+                    succeeded += success
+                    rate = finished / max(time.monotonic() - start, 0.001)
+                    if success:
+                        status = "✅ Downloaded"
+                    elif retry_queue.is_scheduled(pin_url):
+                        status = "🔁 Retry scheduled"
+                    else:
+                        status = "❌ Failed"
+                    print(f"{status}: {pin_id} ({finished} done, {len(in_flight)} in flight, {rate:.1f} pins/s)")
+                    if finished % 25 == 0:
+                        self.logger.info(f"Host limits after {finished} pins: {scraper.host_limiter.describe()}")
+        finally:
+            self._close_worker_browsers(executor)
+            executor.shutdown()
+
+        self.logger.info(f"Downloaded {succeeded}/{finished} pins in {time.monotonic() - start:.1f}s (peak {self.stats['peak_in_flight']} in flight)")
+        self.logger.info(f"Host limits: {scraper.host_limiter.describe()}")
+        return succeeded
+
+    def _close_worker_browsers(self, executor):
+        """Close the fallback browser each worker thread may have opened (they're thread-bound)"""
+        barrier = threading.Barrier(self.max_in_flight)
+
+        def close_on_this_thread():
+            self.scraper.browser_pool.close()
+            # Hold the thread until every worker got its own close task
+            try:
+                barrier.wait(timeout=30)
+            except threading.BrokenBarrierError:
+                pass
+
+        closers = [executor.submit(close_on_this_thread) for _ in range(self.max_in_flight)]
+        wait(closers)
+
+class FileCommitter:
+    """Durable, atomic commit of downloaded files.
+
+    Downloads are streamed into `<name>.part` files and handed over here. Every
+    `batch_size` files (or `max_delay` seconds after the oldest one arrived, on a
+    timer, so a slow tail isn't left uncommitted) the batch is committed: each
+    temp file is fsynced and renamed over its final name, the directory is fsynced
+    once, and only then does `on_commit` mark the pins processed. A crash can't
+    leave a truncated image that dedup treats as done, and the processed-pins
+    journal is appended once per batch instead of once per pin.
+    """
+
+    def __init__(self, logger, on_commit, batch_size=16, max_delay=2.0):
+        self.logger = logger
+        self.on_commit = on_commit
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        # (pin_id, temp_path, final_path, size, sha256, details) waiting for the next commit
+        self.pending = []
+        self.pending_ids = set()
+        self.oldest = None
+        # Commits a batch that is still short of batch_size once it is max_delay old
+        self.timer = None
+        self.stats = {'files': 0, 'bytes': 0, 'batches': 0, 'failures': 0}
+
+    def is_pending(self, pin_id):
+        return pin_id in self.pending_ids
+
+    def add(self, pin_id, temp_path, final_path, size, sha256, details=None):
+        with self.lock:
+            self.pending.append((pin_id, temp_path, final_path, size, sha256, details))
+            self.pending_ids.add(pin_id)
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+                self._arm_timer(self.max_delay)
+            if len(self.pending) >= self.batch_size or time.monotonic() - self.oldest >= self.max_delay:
+                self._commit()
+
+    def _arm_timer(self, delay):
+        timer = threading.Timer(delay, lambda: self._commit_due(timer))
+        timer.daemon = True
+        self.timer = timer
+        timer.start()
+
+    def _commit_due(self, timer):
+        with self.lock:
+            # A commit in the meantime cancelled or replaced this timer
+            if timer is not self.timer or self.oldest is None:
+                return
+            self.timer = None
+            remaining = self.max_delay - (time.monotonic() - self.oldest)
+            if remaining > 0:
+                self._arm_timer(remaining)
+            else:
+                self._commit()
+
+    def flush(self):
+        """Commit whatever is pending"""
+        with self.lock:
+            self._commit()
+
+    def _commit(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.oldest = None
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        committed = []
+        directories = set()
+        for record in batch:
+            pin_id, temp_path, final_path = record[:3]
+            try:
+                fd = os.open(temp_path, os.O_RDWR)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                os.replace(temp_path, final_path)
+                directories.add(os.path.dirname(os.path.abspath(final_path)))
+                committed.append(record)
+            except OSError as e:
+                self.stats['failures'] += 1
+                self.logger.error(f"Could not commit {final_path}: {e}")
+
+        for directory in directories:
+            self._fsync_directory(directory)
+
+        if committed:
+            self.on_commit(committed)
+        self.pending_ids.difference_update(record[0] for record in batch)
+
+        self.stats['files'] += len(committed)
+        self.stats['bytes'] += sum(record[3] for record in committed)
+        self.stats['batches'] += 1
+        self.logger.debug(f"Committed {len(committed)}/{len(batch)} downloaded files")
+
+    @staticmethod
+    def _fsync_directory(path):
+        """Make renames in a directory durable (not possible on Windows - skipped there)"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def log_stats(self):
+        if self.stats['batches']:
+            self.logger.info(f"File commits: {self.stats['files']} files ({self.stats['bytes'] / (1024 * 1024):.1f} MB) in {self.stats['batches']} fsync batches, {self.stats['failures']} failed")
+
+class ProcessedPinJournal:
+    """Processed-pins registry: a JSON snapshot plus an append-only journal.
+
+    `processed_pins.json` stays the snapshot (same list format as before). Every
+    newly processed pin is appended to the journal as one line, so marking a pin
+    is O(1) instead of rewriting the whole history. Appends are fsynced in
+    batches (every `sync_every` pins or `sync_interval` seconds, and on flush).
+    Loading replays the journal on top of the snapshot and ignores a torn last
+    line. Once the journal outgrows `compact_ratio` of the snapshot it is folded
+    into a new snapshot (temp file + fsync + rename) and truncated, which keeps
+    compaction amortized O(1) per pin. A crash between the two steps is harmless:
+    replaying pins already in the snapshot changes nothing.
+    """
+
+    def __init__(self, snapshot_path, journal_path, logger, sync_every=64, sync_interval=1.0,
+                 compact_ratio=0.5, min_compact=1000):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.logger = logger
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self.lock = threading.Lock()
+        self.pins = set()
+        self.journal = None
+        self.journal_entries = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.stats = {'appended': 0, 'syncs': 0, 'compactions': 0}
+
+    def __contains__(self, pin_id):
+        return pin_id in self.pins
+
+    def __len__(self):
+        return len(self.pins)
+
+    def __iter__(self):
+        return iter(self.pins)
+
+    def load(self):
+        """Read the snapshot, then replay the journal on top of it"""
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r') as f:
+                    self.pins = set(json.load(f))
+                self.logger.info(f"Loaded {len(self.pins)} processed pins from history")
+            else:
+                self.logger.info("No previous processed pins history found")
+        except Exception as e:
+            self.logger.error(f"Error loading processed pins: {e}")
+
+        if os.path.exists(self.journal_path):
+            try:
+                complete = 0
+                with open(self.journal_path, 'rb') as f:
+                    for line in f:
+                        # A kill mid-append can leave a partial last line without its newline
+                        if not line.endswith(b"\n"):
+                            break
+                        complete += len(line)
+                        pin_id = line.strip().decode('utf-8')
+                        if pin_id:
+                            self.pins.add(pin_id)
+                            self.journal_entries += 1
+                if complete < os.path.getsize(self.journal_path):
+                    # Cut the torn tail so the next append starts on a fresh line
+                    os.truncate(self.journal_path, complete)
+                self.logger.info(f"Replayed {self.journal_entries} journal entries - {len(self.pins)} processed pins")
+            except Exception as e:
+                self.logger.error(f"Error replaying processed pins journal: {e}")
+        return self
+
+    def add(self, pin_id):
+        self.update([pin_id])
+
+    def record_downloads(self, rows):
+        """Downloaded pins with their details - the journal keeps only the ids"""
+        self.update([row['pin_id'] for row in rows])
+
+    def update(self, pin_ids):
+        """Append the pins that are new to the journal (fsync batched)"""
+        with self.lock:
+            new_ids = [pin_id for pin_id in pin_ids if pin_id not in self.pins]
+            if not new_ids:
+                return
+            self.pins.update(new_ids)
+            try:
+                if self.journal is None:
+                    self.journal = open(self.journal_path, 'a', encoding='utf-8')
+                self.journal.write("".join(f"{pin_id}\n" for pin_id in new_ids))
+            except OSError as e:
+                self.logger.error(f"Error appending to processed pins journal: {e}")
+                return
+            self.journal_entries += len(new_ids)
+            self.unsynced += len(new_ids)
+            self.stats['appended'] += len(new_ids)
+
+            if self.unsynced >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+                self._sync()
+            if self.journal_entries >= max(self.min_compact, self.compact_ratio * (len(self.pins) - self.journal_entries)):
+                self._compact()
+
+    def flush(self):
+        """fsync whatever was appended since the last sync"""
+        with self.lock:
+            self._sync()
+
+    def compact(self):
+        with self.lock:
+            self._compact()
+
+    def close(self):
+        """Fold the journal into the snapshot and close it"""
+        with self.lock:
+            if self.journal_entries:
+                self._compact()
+            self._sync()
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+
+    def _sync(self):
+        self.last_sync = time.monotonic()
+        if self.journal is None or not self.unsynced:
+            return
+        try:
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.unsynced = 0
+            self.stats['syncs'] += 1
+        except OSError as e:
+            self.logger.error(f"Error syncing processed pins journal: {e}")
+
+    def _compact(self):
+        """Write a new snapshot with every pin, then truncate the journal"""
+        temp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(sorted(self.pins), f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.snapshot_path)
+            FileCommitter._fsync_directory(os.path.dirname(os.path.abspath(self.snapshot_path)))
+
+            if self.journal is not None:
+                self.journal.close()
+            self.journal = open(self.journal_path, 'w', encoding='utf-8')
+            self.journal_entries = 0
+            self.unsynced = 0
+            self.stats['compactions'] += 1
+            self.logger.debug(f"Compacted processed pins journal into a snapshot of {len(self.pins)} pins")
+        except OSError as e:
+            self.logger.error(f"Error compacting processed pins journal: {e}")
+
+    def log_stats(self):
+        if self.stats['appended']:
+            self.logger.info(f"Processed pins journal: {self.stats['appended']} appended, {self.stats['syncs']} fsyncs, {self.stats['compactions']} compactions")
+
+class PinIdIndex:
+    """Processed pins as a memory-mapped sorted uint64 array plus a small delta.
+
+    The index file is a 16-byte header (magic, count) followed by the pin ids as
+    sorted native-endian uint64. Opening it maps the file instead of parsing it,
+    so startup time and RSS no longer grow with the history; membership is a
+    binary search over the mapping (about 24 probes for 10M pins). New pins go to
+    an in-memory delta set backed by an append-only delta file (fsync batched,
+    torn last line cut off on load). Once the delta holds `merge_every` pins it
+    is merged into a new array (temp file + fsync + rename): each new id is
+    bisected into the mapped array and the runs between them are copied as raw
+    bytes, so a merge costs one file copy plus O(delta log n) and never loads
+    the array. Ids that don't fit a uint64 stay in the delta for good. A missing
+    index is built from processed_pins.json and its journal.
+    """
+
+    MAGIC = b'PINIDX1\n'
+    HEADER = struct.Struct('<8sQ')
+    ID = struct.Struct('=Q')
+
+    def __init__(self, path, logger, sync_every=64, sync_interval=1.0, merge_every=50000):
+        self.path = path
+        self.delta_path = f"{path}.delta"
+        self.logger = logger
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.merge_every = merge_every
+        self.lock = threading.Lock()
+        self.file = None
+        self.map = None
+        self.view = None
+        self.ids = memoryview(b'').cast('Q')
+        self.delta = set()
+        self.delta_file = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.stats = {'appended': 0, 'syncs': 0, 'merges': 0}
+
+    @staticmethod
+    def _as_uint64(pin_id):
+        if pin_id.isdigit():
+            value = int(pin_id)
+            if value < 1 << 64:
+                return value
+        return None
+
+    def load(self, snapshot_path=None, journal_path=None):
+        """Map the index (building it from the JSON history if needed) and replay the delta"""
+        start = time.monotonic()
+        try:
+            if not os.path.exists(self.path) and snapshot_path and os.path.exists(snapshot_path):
+                history = ProcessedPinJournal(snapshot_path, journal_path, self.logger).load()
+                self.delta.update(history)
+                self._merge()
+                self.logger.info(f"Built {self.path} from {snapshot_path} ({len(history)} pins)")
+            self._map()
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error opening pin index {self.path}: {e}")
+
+        if os.path.exists(self.delta_path):
+            try:
+                complete = 0
+                with open(self.delta_path, 'rb') as f:
+                    for line in f:
+                        # A kill mid-append can leave a partial last line without its newline
+                        if not line.endswith(b"\n"):
+                            break
+                        complete += len(line)
+                        pin_id = line.strip().decode('utf-8')
+                        if pin_id:
+                            self.delta.add(pin_id)
+                if complete < os.path.getsize(self.delta_path):
+                    os.truncate(self.delta_path, complete)
+            except Exception as e:
+                self.logger.error(f"Error replaying pin index delta: {e}")
+
+        self.logger.info(f"Pin index {self.path}: {len(self.ids)} mapped + {len(self.delta)} delta pins, opened in {time.monotonic() - start:.3f}s")
+        return self
+
+    def _map(self):
+        self._unmap()
+        if not os.path.exists(self.path):
+            return
+        self.file = open(self.path, 'rb')
+        header = self.file.read(self.HEADER.size)
+        if len(header) < self.HEADER.size:
+            raise ValueError("truncated header")
+        magic, count = self.HEADER.unpack(header)
+        if magic != self.MAGIC or os.fstat(self.file.fileno()).st_size != self.HEADER.size + 8 * count:
+            raise ValueError("not a pin index or truncated")
+        if count:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.map)
+            self.ids = self.view[self.HEADER.size:].cast('Q')
+
+    def _unmap(self):
+        # Views must be released before the mapping can close (and before Windows lets us replace the file)
+        self.ids.release()
+        self.ids = memoryview(b'').cast('Q')
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _contains(self, pin_id):
+        if pin_id in self.delta:
+            return True
+        value = self._as_uint64(pin_id)
+        if value is None:
+            return False
+        i = bisect.bisect_left(self.ids, value)
+        return i < len(self.ids) and self.ids[i] == value
+
+    def __contains__(self, pin_id):
+        with self.lock:
+            return self._contains(pin_id)
+
+    def __len__(self):
+        return len(self.ids) + len(self.delta)
+
+    def __iter__(self):
+        with self.lock:
+            pin_ids = [str(value) for value in self.ids] + list(self.delta)
+        return iter(pin_ids)
+
+    def add(self, pin_id):
+        self.update([pin_id])
+
+    def record_downloads(self, rows):
+        """Downloaded pins with their details - the index keeps only the ids"""
+        self.update([row['pin_id'] for row in rows])
+
+    def update(self, pin_ids):
+        """Add new pins to the delta and its file (fsync batched); merge once the delta is big"""
+        with self.lock:
+            new_ids = [pin_id for pin_id in dict.fromkeys(pin_ids) if not self._contains(pin_id)]
+            if not new_ids:
+                return
+            self.delta.update(new_ids)
+            try:
+                if self.delta_file is None:
+                    self.delta_file = open(self.delta_path, 'a', encoding='utf-8')
+                self.delta_file.write("".join(f"{pin_id}\n" for pin_id in new_ids))
+            except OSError as e:
+                self.logger.error(f"Error appending to pin index delta: {e}")
+                return
+            self.unsynced += len(new_ids)
+            self.stats['appended'] += len(new_ids)
+
+            if self.unsynced >= self.sync_every or time.monotonic() - self.last_sync >= self.sync_interval:
+                self._sync()
+            if len(self.delta) >= self.merge_every:
+                self._merge()
+
+    def flush(self):
+        with self.lock:
+            self._sync()
+
+    def compact(self):
+        """Merge the delta into the mapped array now"""
+        with self.lock:
+            self._merge()
+
+    def close(self):
+        with self.lock:
+            self._sync()
+            if self.delta_file is not None:
+                self.delta_file.close()
+                self.delta_file = None
+            self._unmap()
+
+    def _sync(self):
+        self.last_sync = time.monotonic()
+        if self.delta_file is None or not self.unsynced:
+            return
+        try:
+            self.delta_file.flush()
+            os.fsync(self.delta_file.fileno())
+            self.unsynced = 0
+            self.stats['syncs'] += 1
+        except OSError as e:
+            self.logger.error(f"Error syncing pin index delta: {e}")
+
+    def _merge(self):
+        """Write mapped ids + delta as a new sorted array, remap it, keep only overflow ids in the delta"""
+        new_values, overflow = [], []
+        for pin_id in self.delta:
+            value = self._as_uint64(pin_id)
+            if value is None:
+                overflow.append(pin_id)
+            else:
+                new_values.append(value)
+        new_values.sort()
+        if not new_values and os.path.exists(self.path):
+            return
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(self.HEADER.pack(self.MAGIC, len(self.ids) + len(new_values)))
+                if len(self.ids):
+                    position = 0
+                    for value in new_values:
+                        i = bisect.bisect_left(self.ids, value, position)
+                        f.write(self.ids[position:i])
+                        f.write(self.ID.pack(value))
+                        position = i
+                    f.write(self.ids[position:])
+                else:
+                    array('Q', new_values).tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            self._unmap()
+            os.replace(temp_path, self.path)
+            FileCommitter._fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+            self._map()
+
+            # The delta file now only has to remember the ids the array can't hold
+            if self.delta_file is not None:
+                self.delta_file.close()
+            with open(f"{self.delta_path}.tmp", 'w', encoding='utf-8') as f:
+                f.writelines(f"{pin_id}\n" for pin_id in overflow)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(f"{self.delta_path}.tmp", self.delta_path)
+            self.delta_file = open(self.delta_path, 'a', encoding='utf-8')
+            self.delta = set(overflow)
+            self.unsynced = 0
+            self.stats['merges'] += 1
+            self.logger.debug(f"Merged {len(new_values)} pins into {self.path} ({len(self.ids)} total)")
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error merging pin index: {e}")
+
+    def log_stats(self):
+        if self.stats['appended']:
+            self.logger.info(f"Pin index: {self.stats['appended']} appended, {self.stats['syncs']} fsyncs, {self.stats['merges']} merges, "
+                             f"{len(self.ids)} mapped + {len(self.delta)} delta pins")
+
+class PinRegistry:
+    """SQLite (WAL) registry of processed pins and where each file came from.
+
+    Same set-like interface as ProcessedPinJournal, plus one row per pin with
+    keyword, pin URL, the pin whose page surfaced it, image URL, file path,
+    size, sha256 and timestamp. Writes are buffered and committed in one
+    transaction every `batch_size` rows or `max_delay` seconds (and on flush);
+    lookups check the buffer, then the primary key index. An empty registry
+    imports processed_pins.json and its journal on first open; those rows only
+    carry the pin id.
+    """
+
+    COLUMNS = ('pin_id', 'keyword', 'pin_url', 'source_pin_id', 'image_url', 'file_path', 'size', 'sha256', 'processed_at')
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pins (
+            pin_id TEXT PRIMARY KEY,
+            keyword TEXT,
+            pin_url TEXT,
+            source_pin_id TEXT,
+            image_url TEXT,
+            file_path TEXT,
+            size INTEGER,
+            sha256 TEXT,
+            processed_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS pins_keyword ON pins (keyword);
+        CREATE INDEX IF NOT EXISTS pins_sha256 ON pins (sha256);
+    """
+
+    def __init__(self, path, logger, batch_size=64, max_delay=1.0):
+        self.path = path
+        self.logger = logger
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        # Connection shared by the download threads, serialized by self.lock
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(self.SCHEMA)
+        self.pending = {}
+        self.oldest = None
+        self.stats = {'rows': 0, 'commits': 0}
+
+    def load(self, snapshot_path=None, journal_path=None):
+        """Import the JSON history (snapshot + journal) into an empty registry"""
+        if self.db.execute("SELECT 1 FROM pins LIMIT 1").fetchone() is None and snapshot_path:
+            history = ProcessedPinJournal(snapshot_path, journal_path, self.logger).load()
+            if len(history):
+                with self.db:
+                    self.db.executemany("INSERT OR IGNORE INTO pins (pin_id) VALUES (?)", ((pin_id,) for pin_id in history))
+                self.logger.info(f"Imported {len(history)} processed pins from {snapshot_path} into {self.path}")
+        self.logger.info(f"Pin registry {self.path}: {len(self)} processed pins")
+        return self
+
+    def __contains__(self, pin_id):
+        with self.lock:
+            if pin_id in self.pending:
+                return True
+            return self.db.execute("SELECT 1 FROM pins WHERE pin_id = ?", (pin_id,)).fetchone() is not None
+
+    def __len__(self):
+        self.flush()
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM pins").fetchone()[0]
+
+    def __iter__(self):
+        self.flush()
+        with self.lock:
+            pin_ids = [row[0] for row in self.db.execute("SELECT pin_id FROM pins")]
+        return iter(pin_ids)
+
+    def add(self, pin_id):
+        self.update([pin_id])
+
+    def update(self, pin_ids):
+        self.record_downloads([{'pin_id': pin_id} for pin_id in pin_ids])
+
+    def record_downloads(self, rows):
+        """Buffer pins (dicts with pin_id and any of COLUMNS) for the next batch commit"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            for row in rows:
+                if 'file_path' not in row and row['pin_id'] in self.pending:
+                    continue
+                self.pending[row['pin_id']] = dict(row, processed_at=row.get('processed_at', now))
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+            if len(self.pending) >= self.batch_size or time.monotonic() - self.oldest >= self.max_delay:
+                self._commit()
+
+    def flush(self):
+        with self.lock:
+            self._commit()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.db.close()
+
+    def _commit(self):
+        if not self.pending:
+            return
+        rows, self.pending = list(self.pending.values()), {}
+        self.oldest = None
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        detailed = [tuple(row.get(column) for column in self.COLUMNS) for row in rows if 'file_path' in row]
+        bare = [(row['pin_id'], row['processed_at']) for row in rows if 'file_path' not in row]
+        try:
+            with self.db:
+                # A download's details replace whatever was known; a bare mark never erases them
+                self.db.executemany(f"INSERT OR REPLACE INTO pins ({', '.join(self.COLUMNS)}) VALUES ({placeholders})", detailed)
+                self.db.executemany("INSERT OR IGNORE INTO pins (pin_id, processed_at) VALUES (?, ?)", bare)
+            self.stats['rows'] += len(rows)
+            self.stats['commits'] += 1
+        except sqlite3.Error as e:
+            self.logger.error(f"Error committing {len(rows)} pins to the registry: {e}")
+
+    def lookup(self, pin_id):
+        """Everything recorded about one pin, or None"""
+        self.flush()
+        with self.lock:
+            row = self.db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM pins WHERE pin_id = ?", (pin_id,)).fetchone()
+        return dict(zip(self.COLUMNS, row)) if row else None
+
+    def keyword_counts(self):
+        """[(keyword, pins, bytes)] - imported pins have keyword None"""
+        self.flush()
+        with self.lock:
+            return self.db.execute(
+                "SELECT keyword, COUNT(*), COALESCE(SUM(size), 0) FROM pins GROUP BY keyword ORDER BY COUNT(*) DESC"
+            ).fetchall()
+
+    def missing_files(self, save_folder):
+        """Pin ids whose downloaded file is gone (imported pins are looked up as <pin_id>.jpg)"""
+        self.flush()
+        with self.lock:
+            rows = self.db.execute("SELECT pin_id, file_path FROM pins").fetchall()
+        return [
+            pin_id for pin_id, file_path in rows
+            if not os.path.exists(file_path or os.path.join(save_folder, f"{pin_id}.jpg"))
+        ]
+
+    def duplicate_hashes(self):
+        """[(sha256, pins)] for content saved more than once under different pin ids"""
+        self.flush()
+        with self.lock:
+            return self.db.execute(
+                "SELECT sha256, COUNT(*) FROM pins WHERE sha256 IS NOT NULL GROUP BY sha256 HAVING COUNT(*) > 1"
+            ).fetchall()
+
+    def log_stats(self):
+        if self.stats['rows']:
+            self.logger.info(f"Pin registry: {self.stats['rows']} pins recorded in {self.stats['commits']} transactions")
+
+class ResolutionCache:
+    """LRU/TTL memory of which resolution an image really has.
+
+    Entries are keyed by the size-independent image path and hold the size segment
+    that worked ('originals' or '1200x'), so a retry or a second keyword never pays
+    for the same miss twice. Per URL pattern (host + file type) it also counts how
+    often originals exist; once they mostly fail for a pattern, 1200x is tried first.
+    """
+
+    def __init__(self, max_entries=5000, ttl=6 * 3600, min_samples=10):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # pattern -> [originals found, originals missing]
+        self.patterns = {}
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self.entries.pop(key, None)
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, size):
+        with self.lock:
+            self.entries[key] = (size, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def record_pattern(self, pattern, originals_found):
+        with self.lock:
+            counts = self.patterns.setdefault(pattern, [0, 0])
+            counts[0 if originals_found else 1] += 1
+
+    def prefer_originals(self, pattern):
+        found, missing = self.patterns.get(pattern, (0, 0))
+        if found + missing < self.min_samples:
+            return True
+        return found / (found + missing) >= 0.2
+
+class CrawlFrontier:
+    """Priority-ordered frontier for crawling similar pins beyond two levels.
+
+    Depth 0 holds the search results, depth d+1 the similar pins of depth d.
+    Pins found on productive pages are expanded first, so the crawl follows the
+    branches that keep yielding NEW pins instead of over-scrolling a few pages.
+    The crawl stops once the pin budget is collected.
+    """
+
+    def __init__(self, max_depth=2, fanout=20, pin_budget=None):
+        self.max_depth = max_depth
+        # One fan-out for every depth or a list with one per depth
+        self.fanout = fanout
+        self.pin_budget = pin_budget
+
+        self.heap = []
+        self.sequence = itertools.count()
+        self.visited = set()      # Pin ids already collected (in or out of the queue)
+        self.collected = []       # Pin URLs in discovery order
+        self.stats = {
+            'expansions': 0,
+            'deepest_level': 0
+        }
+
+    def __len__(self):
+        return len(self.heap)
+
+    def fanout_for(self, depth):
+        """Number of similar pins to request from a pin at this depth"""
+        if isinstance(self.fanout, list):
+            return self.fanout[min(depth, len(self.fanout) - 1)]
+        return self.fanout
+
+    @property
+    def budget_left(self):
+        if self.pin_budget is None:
+            return float('inf')
+        return self.pin_budget - len(self.collected)
+
+    def add(self, pin_url, pin_id, depth, score, expand=True):
+        """Record a newly found pin and queue it for expansion if it isn't at max depth"""
+        if pin_id in self.visited or self.budget_left <= 0:
+            return False
+
+        self.visited.add(pin_id)
+        self.collected.append(pin_url)
+        self.stats['deepest_level'] = max(self.stats['deepest_level'], depth)
+
+        if expand and depth < self.max_depth:
+            # Higher score first, shallower first on ties, then discovery order
+            heapq.heappush(self.heap, (-score, depth, next(self.sequence), pin_url))
+        return True
+
+    def pop_wave(self, size):
+        """Take up to `size` of the most promising pins as (pin_url, depth, requested count)"""
+        wave = []
+        budget = self.budget_left
+        while self.heap and len(wave) < size and budget > 0:
+            _, depth, _, pin_url = heapq.heappop(self.heap)
+            requested = min(self.fanout_for(depth), budget)
+            budget -= requested
+            wave.append((pin_url, depth, requested))
+        return wave
+
+    def to_state(self):
+        """JSON-serializable queue, visited set and collected pins for the crawl checkpoint"""
+        return {
+            'heap': [list(entry) for entry in self.heap],
+            'visited': list(self.visited),
+            'collected': list(self.collected),
+            'stats': dict(self.stats)
+        }
+
+    def restore(self, state):
+        """Continue from a to_state() snapshot"""
+        self.heap = [tuple(entry) for entry in state['heap']]
+        heapq.heapify(self.heap)
+        self.sequence = itertools.count(max((entry[2] for entry in self.heap), default=-1) + 1)
+        self.visited = set(state['visited'])
+        self.collected = list(state['collected'])
+        self.stats.update(state['stats'])
+
+class RelevanceScorer:
+    """Cheap keyword relevance score for a pin, from text the grid/feed already gave us.
+
+    Scores the pin's title, alt text and description against the keyword terms
+    and their synonyms, from 0.0 (no term matches) to 1.0 (every term matches).
+    Pins with no text at all get a neutral score so they aren't punished for it.
+    """
+
+    STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'for', 'in', 'on', 'to', 'with', 'by'}
+    DEFAULT_SYNONYMS = {
+        'passport': ['travel document'],
+        'id': ['identity', 'identification', 'card'],
+        'license': ['licence', 'driving', 'driver'],
+        'licence': ['license', 'driving', 'driver'],
+        'number': ['no', 'num'],
+        'card': ['id']
+    }
+    NEUTRAL_SCORE = 0.5
+
+    def __init__(self, keyword, synonyms=None):
+        self.keyword = keyword.lower()
+        merged = dict(self.DEFAULT_SYNONYMS)
+        merged.update(synonyms or {})
+
+        self.terms = [term for term in self.tokenize(keyword) if term not in self.STOPWORDS]
+        self.alternatives = {
+            term: [self.tokenize(synonym) for synonym in merged.get(term, [])]
+            for term in self.terms
+        }
+
+    @staticmethod
+    def tokenize(text):
+        return re.findall(r'[a-z0-9]+', (text or '').lower())
+
+    @staticmethod
+    def _token_matches(term, token):
+        # Cheap stemming - "australian" matches "australia", "passports" matches "passport"
+        if len(term) >= 4 and len(token) >= 4:
+            return token.startswith(term) or term.startswith(token)
+        return token == term
+
+    def _contains(self, tokens, phrase):
+        return any(
+            all(self._token_matches(part, tokens[i + j]) for j, part in enumerate(phrase))
+            for i in range(len(tokens) - len(phrase) + 1)
+        )
+
+    def score(self, metadata):
+        """Fraction of keyword terms found in the pin's text (NEUTRAL_SCORE when there is no text)"""
+        if not metadata or not self.terms:
+            return self.NEUTRAL_SCORE
+
+        text = ' '.join(metadata.get(field) or '' for field in ('title', 'alt', 'description'))
+        tokens = self.tokenize(text)
+        if not tokens:
+            return self.NEUTRAL_SCORE
+
+        matched = sum(
+            1 for term in self.terms
+            if self._contains(tokens, [term]) or any(self._contains(tokens, alt) for alt in self.alternatives[term])
+        )
+        return matched / len(self.terms)
+
+class CrawlCheckpoint:
+    """Crash-safe checkpoint of the crawl, one section per keyword.
+
+    Records the main pins, the pin pages fully expanded, the scroll progress of
+    pages still being expanded, the crawl frontier between expansion waves
+    (--max-depth/--pin-budget crawls), and the pins collected but not downloaded yet
+    (including the ones mid-download). The file is rewritten atomically (temp
+    file + rename), at most once per `min_interval` seconds unless forced, so a
+    crash or Ctrl-C loses seconds of work instead of the whole crawl.
+    """
+
+    def __init__(self, path, logger, min_interval=1.0):
+        self.path = path
+        self.logger = logger
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.data = {'keywords': {}}
+        self.last_save = 0.0
+
+    def load(self):
+        """Load the checkpoint file; returns True if there was one"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+            self.logger.info(f"Loaded crawl checkpoint with {len(self.data['keywords'])} keyword(s)")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error loading crawl checkpoint: {e}")
+            self.data = {'keywords': {}}
+            return False
+
+    def keyword_state(self, keyword):
+        """Checkpoint section of one keyword (created on first use)"""
+        return self.data['keywords'].setdefault(keyword, {
+            'main_pins': [],
+            'expanded': {},
+            'scroll_progress': {},
+            'pending': {},
+            'in_flight': []
+        })
+
+    def has_progress(self, keyword):
+        return bool(self.data['keywords'].get(keyword, {}).get('main_pins'))
+
+    def save(self, force=False):
+        """Atomically write the checkpoint (throttled unless forced)"""
+        now = time.monotonic()
+        if not force and now - self.last_save < self.min_interval:
+            return
+        self.last_save = now
+
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            self.logger.error(f"Error saving crawl checkpoint: {e}")
+
+    def record_main_pins(self, keyword, pin_urls):
+        with self.lock:
+            self.keyword_state(keyword)['main_pins'] = list(pin_urls)
+            self.save(force=True)
+
+    def record_frontier(self, keyword, frontier_state):
+        """Crawl frontier after a finished wave of expansions (CrawlFrontier.to_state())"""
+        with self.lock:
+            self.keyword_state(keyword)['frontier'] = frontier_state
+            self.save(force=True)
+
+    def record_scroll(self, keyword, page_url, scrolls, found_urls):
+        """Progress of a pin page that is still being expanded"""
+        with self.lock:
+            self.keyword_state(keyword)['scroll_progress'][page_url] = {
+                'scrolls': scrolls,
+                'found': list(found_urls)
+            }
+            self.save()
+
+    def record_expanded(self, keyword, page_url, similar_urls):
+        """A pin page finished expanding - its similar pins are final"""
+        with self.lock:
+            state = self.keyword_state(keyword)
+            state['expanded'][page_url] = list(similar_urls)
+            state['scroll_progress'].pop(page_url, None)
+            self.save(force=True)
+
+    def add_pending(self, keyword, pin_url):
+        """A NEW pin was collected and waits for download"""
+        with self.lock:
+            self.keyword_state(keyword)['pending'][pin_url] = True
+            self.save()
+
+    def start_download(self, keyword, pin_url):
+        with self.lock:
+            self.keyword_state(keyword)['in_flight'].append(pin_url)
+            self.save()
+
+    def end_attempt(self, keyword, pin_url):
+        """A download attempt returned; the pin stays pending until its file is committed"""
+        self.finish_download(keyword, pin_url, False)
+
+    def finish_download(self, keyword, pin_url, done):
+        """Drop a pin from in-flight, and from pending once it needs no more work (file committed,
+        already processed, or dead-lettered); other failed pins stay pending so a resume retries them"""
+        with self.lock:
+            state = self.keyword_state(keyword)
+            if pin_url in state['in_flight']:
+                state['in_flight'].remove(pin_url)
+            if done:
+                state['pending'].pop(pin_url, None)
+            self.save()
+
+    def finish_keyword(self, keyword):
+        """Drop a keyword once collection ended and nothing is pending download"""
+        with self.lock:
+            if self.data['keywords'].get(keyword, {}).get('pending'):
+                self.save(force=True)
+                return
+            self.data['keywords'].pop(keyword, None)
+            if self.data['keywords']:
+                self.save(force=True)
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+
+class ScrollHistory:
+    """Remembers, per keyword and source page, the order in which pins were harvested.
+
+    Reruns of a keyword open the same search page (and often the same pin pages),
+    so the top of the grid only brings back pins that are already processed.
+    `known_position` tells a collector how many leading pins hold nothing new; it
+    fast-scrolls until the harvester has seen that many, or in xhr mode jumps there
+    with the saved feed bookmark. Positions count pins, not scrolls, so they don't
+    depend on how far the adaptive pacer happened to scroll each time.
+    """
+
+    def __init__(self, path, logger, max_pages_per_keyword=500, max_pins_per_page=5000):
+        self.path = path
+        self.logger = logger
+        self.max_pages_per_keyword = max_pages_per_keyword
+        self.max_pins_per_page = max_pins_per_page
+        self.lock = threading.Lock()
+        self.data = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Entries from the per-scroll format carry no pin order - drop them
+            self.data = {keyword: {url: entry for url, entry in pages.items() if 'pins' in entry}
+                         for keyword, pages in data.items()}
+            self.logger.info(f"Loaded scroll history for {len(self.data)} keyword(s)")
+        except Exception as e:
+            self.logger.error(f"Error loading scroll history: {e}")
+            self.data = {}
+
+    def save(self):
+        """Atomically write the history, keeping the most recently used pages per keyword"""
+        with self.lock:
+            for keyword, pages in self.data.items():
+                if len(pages) > self.max_pages_per_keyword:
+                    newest = sorted(pages, key=lambda url: pages[url]['updated'], reverse=True)
+                    self.data[keyword] = {url: pages[url] for url in newest[:self.max_pages_per_keyword]}
+
+            temp_path = f"{self.path}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                self.logger.error(f"Error saving scroll history: {e}")
+
+    def _entry(self, keyword, page_url):
+        entry = self.data.setdefault(keyword, {}).setdefault(page_url, {'pins': [], 'bookmark': None})
+        entry['updated'] = time.time()
+        return entry
+
+    def known_position(self, keyword, page_url, is_known):
+        """Number of leading harvested pins that pass is_known(pin_id)"""
+        entry = self.data.get(keyword, {}).get(page_url)
+        if not entry:
+            return 0
+        position = 0
+        for pin_id in entry['pins']:
+            # Unparseable anchors are stored as '' to keep positions aligned
+            if pin_id and not is_known(pin_id):
+                break
+            position += 1
+        return position
+
+    def bookmark(self, keyword, page_url, max_pins):
+        """Saved feed cursor of a page, if it doesn't point past max_pins harvested pins"""
+        entry = self.data.get(keyword, {}).get(page_url)
+        cursor = entry.get('bookmark') if entry else None
+        if cursor and cursor['pins'] <= max_pins:
+            return cursor
+        return None
+
+    def record(self, keyword, page_url, position, pin_ids):
+        """Store the pins a scan harvested, starting at their position in the page's order"""
+        if keyword is None or position >= self.max_pins_per_page:
+            return
+        with self.lock:
+            entry = self._entry(keyword, page_url)
+            pins = entry['pins']
+            if position > len(pins):
+                return
+            pins[position:position + len(pin_ids)] = pin_ids
+            del pins[self.max_pins_per_page:]
+
+    def record_bookmark(self, keyword, page_url, cursor, pins):
+        """Keep the deepest bookmark reached on a page"""
+        if keyword is None or cursor is None:
+            return
+        with self.lock:
+            entry = self._entry(keyword, page_url)
+            if entry['bookmark'] is None or pins >= entry['bookmark']['pins']:
+                entry['bookmark'] = dict(cursor, pins=pins)
 
 class PinterestScraper:
-    def __init__(self):
+    # Size segment of an i.pinimg.com URL: /236x/, /736x/, /60x60/, /originals/ ...
+    IMAGE_SIZE_SEGMENT = re.compile(r'/(\d+x\d*|originals)/')
+
+    # First bytes of the formats i.pinimg.com serves (JPEG, PNG, GIF, WebP); anything else
+    # (an HTML error page, an empty body) is a decode failure, not an image
+    IMAGE_SIGNATURES = (b'\xff\xd8\xff', b'\x89PNG', b'GIF8', b'RIFF')
+
+    # Reads the server-rendered first page of results that never comes through an XHR
+    INITIAL_STATE_JS = """() => {
+        const script = document.getElementById('__PWS_INITIAL_PROPS__') || document.getElementById('__PWS_DATA__');
+        return script ? script.textContent : null;
+    }"""
+
+    # Installs (once per document) a MutationObserver that buffers every pin anchor the grid
+    # renders, including anchors whose href changes when the virtualized grid recycles nodes,
+    # and returns how many pins it has seen. Installing it before fast-forwarding keeps the
+    # top of the grid in the buffer even after the virtualized grid has recycled those nodes.
+    # The anchor's <img> srcset, alt and size come along, so downloads need no pin page visit.
+    # Anchors whose <img> has no src yet (lazy loading) are picked up when the src arrives.
+    PIN_HARVEST_INSTALL_JS = """() => {
+        if (!window.__pinHarvest) {
+            const state = { seen: new Set(), buffer: [], total: 0 };
+            const record = (a) => {
+                const href = a.getAttribute('href');
+                if (!href || !href.startsWith('/pin/') || state.seen.has(href)) return;
+                const img = a.querySelector('img');
+                const src = img ? (img.getAttribute('src') || '') : '';
+                const srcset = img ? (img.getAttribute('srcset') || '') : '';
+                if (img && !src && !srcset) return;
+                state.seen.add(href);
+                const rect = img ? img.getBoundingClientRect() : null;
+                state.buffer.push({
+                    href: href,
+                    alt: img ? (img.getAttribute('alt') || '') : '',
+                    title: a.getAttribute('aria-label') || a.getAttribute('title') || '',
+                    src: src,
+                    srcset: srcset,
+                    width: img ? (img.naturalWidth || parseInt(img.getAttribute('width')) || 0) : 0,
+                    height: img ? (img.naturalHeight || parseInt(img.getAttribute('height')) || 0) : 0,
+                    aspect: rect && rect.width ? rect.height / rect.width : 0
+                });
+                state.total++;
+            };
+            const scan = (node) => {
+                if (node.nodeType !== 1) return;
+                const anchor = node.closest("a[href^='/pin/']");
+                if (anchor) record(anchor);
+                node.querySelectorAll("a[href^='/pin/']").forEach(record);
+            };
+            scan(document.body);
+            new MutationObserver((mutations) => {
+                for (const m of mutations) {
+                    if (m.type === 'attributes') scan(m.target);
+                    else m.addedNodes.forEach(scan);
+                }
+            }).observe(document.body, { childList: true, subtree: true, attributes: true, attributeFilter: ['href', 'src', 'srcset'] });
+            window.__pinHarvest = state;
+        }
+        return window.__pinHarvest.total;
+    }"""
+
+    # Installs the observer if needed and drains its buffer. One evaluate per scroll,
+    # cost proportional to new content only.
+    PIN_HARVEST_JS = """() => {
+        (""" + PIN_HARVEST_INSTALL_JS + """)();
+        const harvest = window.__pinHarvest;
+        const pins = harvest.buffer;
+        harvest.buffer = [];
+        return { pins: pins, total: harvest.total };
+    }"""
+
+    def __init__(self, headless=True, pages_per_context=25, similar_concurrency=4, collection_mode="dom",
+                 min_relevance=0.25, synonyms=None, profile_dir=None, cache_size_mb=512, daemon_address=None,
+                 memory_budget_mb=4096, heap_limit_mb=384, download_concurrency=8, host_limits=None,
+                 probe_originals=False, registry="json"):
         self.SAVE_FOLDER = "Pintrest_data"
         self.LOG_FOLDER = "logs"
         self.PROCESSED_PINS_FILE = "processed_pins.json"
+        self.PROCESSED_PINS_JOURNAL = "processed_pins.journal"
+        self.PIN_REGISTRY_FILE = "pin_registry.db"
+        self.PIN_INDEX_FILE = "processed_pins.idx"
+        self.CHECKPOINT_FILE = "crawl_checkpoint.json"
+        self.SCROLL_HISTORY_FILE = "scroll_history.json"
+        self.DEAD_LETTER_FILE = "dead_letters.jsonl"
+        # Downloads bigger than this are aborted mid-stream
+        self.MAX_IMAGE_BYTES = 50 * 1024 * 1024
+        # Statuses meaning "this resolution doesn't exist" - try the next candidate
+        self.MISSING_RESOLUTION_STATUSES = (403, 404)
+        # Browser-like headers for plain HTTP pin page fetches
+        self.PAGE_HEADERS = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml',
+            'Accept-Language': 'en-US,en;q=0.9'
+        }
 
         # Create directories
         os.makedirs(self.SAVE_FOLDER, exist_ok=True)
@@ -28,14 +3066,91 @@ class PinterestScraper:
         # Initialize logging
         self.setup_logging()
         
-        # Load processed pins history
+        # Partial downloads of an interrupted run were never marked processed - drop them
+        for name in os.listdir(self.SAVE_FOLDER):
+            if name.endswith('.part'):
+                os.remove(os.path.join(self.SAVE_FOLDER, name))
+        
+        # Load processed pins history: "json" is the snapshot + append-only journal,
+        # "sqlite" the pin registry that also records where every file came from,
+        # "mmap" a memory-mapped id index whose startup cost doesn't grow with history
+        self.registry = registry
         self.processed_pins = self.load_processed_pins()
+        # Pin whose page surfaced each similar pin (recorded in the sqlite registry)
+        self.pin_parents = {}
+        
+        # Pins collected for a keyword whose downloads haven't finished yet (batch mode)
+        self.scheduled_pins = set()
         
         # Initialize session
         self.session = requests.Session()
         adapter = requests.adapters.HTTPAdapter(pool_connections=25, pool_maxsize=25)
         self.session.mount("https://", adapter)
         
+        # Per-host connection caps for every HTTP request, and the sliding-window download stage
+        self.host_limiter = HostLimiter(host_limits)
+        self.download_concurrency = download_concurrency
+        self.download_engine = DownloadEngine(self, max_in_flight=download_concurrency)
+        
+        # Failed downloads come back after a backoff or end up in the dead-letter file;
+        # a host that keeps failing is cut off for a while instead of burning attempts
+        self.retry_queue = RetryQueue(self.DEAD_LETTER_FILE, self.logger)
+        self.circuit_breaker = CircuitBreaker(self.logger)
+        
+        # Downloads become visible (renamed) and processed only after a durable batch commit
+        self.file_committer = FileCommitter(self.logger, self._on_files_committed)
+        
+        # Which resolution each image has; downloads GET originals speculatively instead of HEAD + GET.
+        # probe_originals additionally HEADs known image URLs concurrently before a download stage
+        self.resolution_cache = ResolutionCache()
+        self.probe_originals = probe_originals
+        
+        # Shared browser for search, similar-pin and pin pages (optionally on a warm persistent
+        # profile, or leased from browser_daemon.py)
+        self.browser_pool = BrowserPool(
+            self.logger, headless=headless, pages_per_context=pages_per_context,
+            profile_dir=profile_dir, cache_size_mb=cache_size_mb, daemon_address=daemon_address
+        )
+        
+        # Concurrent similar-pin expansion (1 keeps the sequential sync path)
+        self.similar_concurrency = similar_concurrency
+        self.similar_expander = AsyncSimilarPinExpander(
+            self, concurrency=similar_concurrency, headless=headless,
+            profile_dir=f"{profile_dir}-async" if profile_dir else None,
+            daemon_address=daemon_address
+        )
+        
+        # Signal-driven scroll pacing shared by every collector
+        self.pacer = ScrollPacer(self.logger)
+        
+        # Discovery pages skip images/media/fonts/trackers, download pages load everything;
+        # persistent profiles block through CDP so routing doesn't switch their disk cache off
+        self.route_policy = ResourceRoutePolicy(self.logger, keep_cache=profile_dir is not None)
+        
+        # Reloads bloated pin pages on a fresh context and caps concurrent pages to the memory budget
+        self.memory_governor = MemoryGovernor(self.logger, heap_limit_mb=heap_limit_mb, memory_budget_mb=memory_budget_mb)
+        
+        # Main pins scoring below min_relevance are not expanded into similar pins
+        self.min_relevance = min_relevance
+        self.synonyms = synonyms or {}
+        
+        # Crawl checkpoint for --resume; current_keyword tells collectors where to record progress
+        self.checkpoint = CrawlCheckpoint(self.CHECKPOINT_FILE, self.logger)
+        self.current_keyword = None
+        self.resume = False
+        
+        # How deep earlier runs scrolled each page, so reruns skip straight to unseen pins
+        self.scroll_history = ScrollHistory(self.SCROLL_HISTORY_FILE, self.logger)
+        
+        # Streaming mode: collectors hand each NEW pin to pin_sink as soon as it is found,
+        # and stop scrolling once stop_discovery is set
+        self.pin_sink = None
+        self.stop_discovery = threading.Event()
+        
+        # "dom" reads pin anchors from the grid, "xhr" parses Pinterest's feed responses
+        self.collection_mode = collection_mode
+        self.pin_metadata = {}
+        
         # Statistics
         self.stats = {
             'main_pins_found': 0,
@@ -43,7 +3158,18 @@ class PinterestScraper:
             'total_unique_pins': 0,
             'successful_downloads': 0,
             'skipped_duplicates': 0,
-            'failed_downloads': 0
+            'failed_downloads': 0,
+            'download_retries': 0,
+            'image_urls_from_feed': 0,
+            'low_relevance_skipped': 0,
+            'history_pins_skipped': 0,
+            'meta_http_hits': 0,
+            'meta_http_seconds': 0.0,
+            'meta_browser_fallbacks': 0,
+            'meta_browser_seconds': 0.0,
+            'image_round_trips': 0,
+            'image_round_trips_baseline': 0,
+            'first_image_seconds': None
         }
         
         self.logger.info("Pinterest Multi-Level Scraper initialized")
@@ -76,28 +3202,18 @@ class PinterestScraper:
         self.logger.info(f"Logging initialized. Log file: {log_path}")
 
     def load_processed_pins(self):
-        """Load previously processed pin IDs from file"""
-        try:
-            if os.path.exists(self.PROCESSED_PINS_FILE):
-                with open(self.PROCESSED_PINS_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.logger.info(f"Loaded {len(data)} processed pins from history")
-                    return set(data)
-            else:
-                self.logger.info("No previous processed pins history found")
-                return set()
-        except Exception as e:
-            self.logger.error(f"Error loading processed pins: {e}")
-            return set()
+        """Load previously processed pin IDs: the snapshot file with its journal replayed on top,
+        or the sqlite registry / mmap index (which import that history the first time)"""
+        if self.registry == "sqlite":
+            return PinRegistry(self.PIN_REGISTRY_FILE, self.logger).load(self.PROCESSED_PINS_FILE, self.PROCESSED_PINS_JOURNAL)
+        if self.registry == "mmap":
+            return PinIdIndex(self.PIN_INDEX_FILE, self.logger).load(self.PROCESSED_PINS_FILE, self.PROCESSED_PINS_JOURNAL)
+        return ProcessedPinJournal(self.PROCESSED_PINS_FILE, self.PROCESSED_PINS_JOURNAL, self.logger).load()
 
     def save_processed_pins(self):
-        """Save processed pin IDs to file"""
-        try:
-            with open(self.PROCESSED_PINS_FILE, 'w') as f:
-                json.dump(list(self.processed_pins), f, indent=2)
-            self.logger.debug(f"Saved {len(self.processed_pins)} processed pins to history")
-        except Exception as e:
-            self.logger.error(f"Error saving processed pins: {e}")
+        """Make every processed pin recorded so far durable"""
+        self.processed_pins.flush()
+        self.logger.debug("Synced processed pins history")
 
     def extract_pin_id_from_url(self, pin_url):
         """Extract pin ID from full URL with multiple pattern support"""
@@ -134,73 +3250,211 @@ class PinterestScraper:
         self.logger.warning(f"Could not extract pin ID from URL: {pin_url}")
         return None
 
+    def is_pin_claimed(self, pin_id):
+        """Check if pin ID was already processed or is queued for download by an earlier keyword"""
+        return pin_id in self.scheduled_pins or self.is_pin_already_processed(pin_id)
+
     def is_pin_already_processed(self, pin_id):
-        """Check if pin ID was already processed"""
-        is_processed = pin_id in self.processed_pins
+        """Check if pin ID was already processed (or downloaded and waiting for its commit)"""
+        is_processed = pin_id in self.processed_pins or self.file_committer.is_pending(pin_id)
         if is_processed:
             self.logger.debug(f"Pin {pin_id} already processed - skipping")
         return is_processed
 
+    def forget_processed_pin(self, keyword, pin_url, pin_id):
+        """Drop a pin that needs no download from the checkpoint's pending list.
+        Pins still waiting for their file commit are left to the commit callback."""
+        if pin_id is None or pin_id in self.processed_pins:
+            self.checkpoint.finish_download(keyword, pin_url, True)
+
     def mark_pin_as_processed(self, pin_id):
-        """Mark pin ID as processed"""
+        """Mark pin ID as processed (one journal append)"""
         self.processed_pins.add(pin_id)
-        self.save_processed_pins()
         self.logger.debug(f"Marked pin {pin_id} as processed")
 
-    def wait_for_page_load(self, page, timeout=60):
-        """Wait for page to be fully loaded - increased timeout for more content"""
+    def mark_pins_as_processed(self, pin_ids):
+        """Mark several pin IDs as processed with a single journal append"""
+        self.processed_pins.update(pin_ids)
+        self.logger.debug(f"Marked {len(pin_ids)} pins as processed")
+
+    def _on_files_committed(self, records):
+        """FileCommitter callback - the files are durable, so the pins count as processed"""
+        rows = []
+        for pin_id, _, final_path, size, sha256, details in records:
+            self.logger.debug(f"Committed {final_path} ({size} bytes, sha256 {sha256})")
+            rows.append(dict(details or {}, pin_id=pin_id, source_pin_id=self.pin_parents.get(pin_id),
+                             file_path=final_path, size=size, sha256=sha256))
+        self.processed_pins.record_downloads(rows)
+        self.processed_pins.flush()
+        # Only now may the checkpoint forget the pins - a crash before this point retries them on --resume
+        for row in rows:
+            if row.get('pin_url'):
+                self.checkpoint.finish_download(row.get('keyword'), row['pin_url'], True)
+        self.logger.debug(f"Marked {len(rows)} pins as processed")
+
+    def wait_for_page_load(self, page, tracker=None, fixed_delay=5):
+        """Wait for the DOM, then for any Pinterest grid selector (raced) and pending requests"""
         self.logger.debug("Waiting for page to be fully loaded...")
         
         try:
             page.wait_for_load_state("domcontentloaded", timeout=20000)
             self.logger.debug("DOM content loaded")
             
-            try:
-                page.wait_for_load_state("networkidle", timeout=30000)
-                self.logger.debug("Network idle achieved")
-            except Exception as e:
-                self.logger.debug(f"Network idle timeout: {e}")
-            
-            selectors_to_try = [
-                "div[data-test-id='pin']",
-                "div[data-test-id='pinWrapper']", 
-                "div[role='button']",
-                "img[alt]",
-                "a[href*='/pin/']"
-            ]
-            
-            selector_found = False
-            for selector in selectors_to_try:
-                try:
-                    page.wait_for_selector(selector, state="attached", timeout=15000)
-                    self.logger.debug(f"Found selector: {selector}")
-                    selector_found = True
-                    break
-                except Exception as e:
-                    self.logger.debug(f"Selector {selector} not found: {e}")
-                    continue
-            
-            if not selector_found:
+            if not self.pacer.wait_for_grid(page, tracker, fixed_delay=fixed_delay):
                 self.logger.warning("No Pinterest-specific selectors found, continuing anyway")
             
-            sleep(5)  # Increased sleep time for more content loading
             self.logger.debug("Page loading complete")
             return True
             
         except Exception as e:
             self.logger.warning(f"Page load wait error: {e}")
-            sleep(5)  # Increased sleep time
             return False
 
-        
-    def set_page_zoom(self, page, zoom_level=None):
-        """Set page zoom level with fallback to instance default"""
-        if zoom_level is None:
-            zoom_level = self.zoom_level
-            
-        self.logger.info(f"Setting page zoom to {int(zoom_level * 100)}%")
-        page.evaluate(f"document.body.style.zoom = '{zoom_level}'")
-        print(f"🔍 Set page zoom to {int(zoom_level * 100)}% for better pin visibility")
+    def set_page_zoom(self, page, zoom_level=None):
+        """Set page zoom level with fallback to instance default"""
+        if zoom_level is None:
+            zoom_level = self.zoom_level
+            
+        self.logger.info(f"Setting page zoom to {int(zoom_level * 100)}%")
+        page.evaluate(f"document.body.style.zoom = '{zoom_level}'")
+        print(f"🔍 Set page zoom to {int(zoom_level * 100)}% for better pin visibility")
+
+    def _attach_harvester(self, page):
+        """Return a feed harvester bound to the page in xhr mode, None in dom mode"""
+        if self.collection_mode != "xhr":
+            return None
+        harvester = FeedResponseHarvester(self.logger)
+        harvester.attach(page)
+        return harvester
+
+    def _scan_page_for_pins(self, page, harvester, total_pins_checked):
+        """Return ([(pin_url, metadata)], total pins seen on page) for pins that appeared since the last scan"""
+        if harvester is not None:
+            feed_pins = harvester.drain()
+            if total_pins_checked == 0:
+                feed_pins = harvester.parse_initial_state(page.evaluate(self.INITIAL_STATE_JS)) + feed_pins
+            return [(pin['url'], pin) for pin in feed_pins], total_pins_checked + len(feed_pins)
+
+        batch = page.evaluate(self.PIN_HARVEST_JS)
+        return self._grid_candidates(batch), batch['total']
+
+    @classmethod
+    def grid_image_urls(cls, src, srcset):
+        """Map size segment ('236x', '736x', ..., 'orig') to URL for a grid <img>.
+
+        Every i.pinimg.com size shares its path with /originals/, so the originals URL
+        is derived from the largest variant when the srcset doesn't list it.
+        """
+        candidates = [entry.strip().split(' ')[0] for entry in srcset.split(',') if entry.strip()]
+        if src:
+            candidates.append(src)
+
+        image_urls = {}
+        for url in candidates:
+            match = cls.IMAGE_SIZE_SEGMENT.search(url)
+            if match:
+                size = 'orig' if match.group(1) == 'originals' else match.group(1)
+                image_urls.setdefault(size, url)
+
+        if image_urls and 'orig' not in image_urls:
+            largest = max(image_urls.values(), key=lambda url: int(cls.IMAGE_SIZE_SEGMENT.search(url).group(1).split('x')[0]))
+            image_urls['orig'] = cls.IMAGE_SIZE_SEGMENT.sub('/originals/', largest, count=1)
+        return image_urls
+
+    @classmethod
+    def _grid_candidates(cls, batch):
+        """Turn a drained PIN_HARVEST_JS batch into (pin_url, metadata) pairs"""
+        candidates = []
+        for pin in batch['pins']:
+            full_url = urllib.parse.urljoin("https://www.pinterest.com", pin['href'])
+            image_urls = cls.grid_image_urls(pin.get('src', ''), pin.get('srcset', ''))
+            sized = [size for size in image_urls if size != 'orig']
+            largest = max(sized, key=lambda size: int(size.split('x')[0]), default=None)
+
+            # Without natural dimensions (images are blocked during discovery) estimate them
+            # from the rendered aspect ratio at the largest variant's width
+            width, height = pin.get('width', 0), pin.get('height', 0)
+            if not width and largest and pin.get('aspect'):
+                width = int(largest.split('x')[0])
+                height = round(width * pin['aspect'])
+
+            candidates.append((full_url, {
+                'url': full_url,
+                'title': pin['title'],
+                'description': '',
+                'alt': pin['alt'],
+                'image_urls': image_urls,
+                'image_url': image_urls.get(largest) if largest else image_urls.get('orig'),
+                'width': width or None,
+                'height': height or None,
+                'source': 'grid'
+            }))
+        return candidates
+
+    def _resume_position(self, page, harvester, page_url):
+        """Skip the part of a page earlier runs already harvested.
+
+        Returns (position of the first pin the next scan returns, feed cursor to continue from or None).
+        A bookmark jump starts past the known pins; fast-forwarding keeps the harvesters
+        buffering from the top of the grid, so its scans still start at position 0.
+        """
+        known = self.scroll_history.known_position(self.current_keyword, page_url, self.is_pin_claimed)
+        if not known:
+            return 0, None
+
+        cursor = self.scroll_history.bookmark(self.current_keyword, page_url, known) if harvester is not None else None
+        if cursor is not None:
+            self.logger.info(f"Jumping past {cursor['pins']} already harvested pins of {page_url} via feed bookmark")
+            self.stats['history_pins_skipped'] += cursor['pins']
+            return cursor['pins'], cursor
+
+        self.logger.info(f"Fast-scrolling past {known} already harvested pins of {page_url}")
+        page.evaluate(self.PIN_HARVEST_INSTALL_JS)
+        self.stats['history_pins_skipped'] += self.pacer.fast_forward(page, known)
+        return 0, None
+
+    def _restore_position(self, page, harvester, previous_harvester, pins):
+        """Bring a page reloaded by a recycle back below the `pins` it had already harvested.
+
+        Returns (pin offset, feed cursor) like _resume_position: in xhr mode the old page's
+        feed bookmark continues right after them, otherwise the grid is fast-scrolled back.
+        """
+        if not pins:
+            return 0, None
+
+        cursor = previous_harvester.last_feed if previous_harvester is not None else None
+        if cursor is not None:
+            harvester.last_feed = cursor
+            return pins, cursor
+
+        page.evaluate(self.PIN_HARVEST_INSTALL_JS)
+        self.pacer.fast_forward(page, pins)
+        return 0, None
+
+    def _advance_page(self, page, tracker, harvester, cursor):
+        """Load the next slice of a grid - by feed bookmark after a jump, else by scrolling; returns the cursor"""
+        if cursor is not None:
+            cursor = harvester.fetch_next(page, cursor)
+            if cursor is not None:
+                return cursor
+        self.pacer.scroll(page, tracker, fixed_delay=4, harvester=harvester)
+        return None
+
+    def _record_scroll_history(self, page_url, pin_offset, candidates, total):
+        """Record a scan's pins at their position: the scan returned the last len(candidates) of `total`"""
+        pin_ids = [self.extract_pin_id_from_url(full_url) or '' for full_url, _ in candidates]
+        self.scroll_history.record(self.current_keyword, page_url, pin_offset + total - len(pin_ids), pin_ids)
+
+    def _finish_scroll_history(self, page_url, harvester, pins):
+        if harvester is not None:
+            self.scroll_history.record_bookmark(self.current_keyword, page_url, harvester.last_feed, pins)
+        self.scroll_history.save()
+
+    def _emit_pin(self, pin_url):
+        """Checkpoint a NEW pin and hand it to the streaming download queue, if one is attached"""
+        self.checkpoint.add_pending(self.current_keyword, pin_url)
+        if self.pin_sink is not None:
+            self.pin_sink(pin_url)
 
     def get_main_pins_from_search(self, keyword, count=30):
         """Get main pins from Pinterest search with 25% zoom - continues until we have enough NEW pins"""
@@ -211,202 +3465,225 @@ class PinterestScraper:
         search_url = f"https://www.pinterest.com/search/pins/?q={search_term}"
         self.logger.debug(f"Search URL: {search_url}")
 
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(headless=True)
-
-            # Create context with default zoom set to 25%
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                device_scale_factor=0.25  # Set default zoom to 25%
-            )
-            page = context.new_page()
+        page = self.browser_pool.acquire_page()
+        self.route_policy.apply(page, "discovery")
+        harvester = self._attach_harvester(page)
+        tracker = self.pacer.attach(page)
+        
+        try:
+            self.logger.info("Navigating to search page")
+            page.goto(search_url, timeout=45000)  # Increased timeout
             
-            try:
-                self.logger.info("Navigating to search page")
-                page.goto(search_url, timeout=45000)  # Increased timeout
-                
-                self.logger.info("Waiting for page to fully load...")
-                print("⏳ Waiting for page to fully load...")
-                self.wait_for_page_load(page)
+            self.logger.info("Waiting for page to fully load...")
+            print("⏳ Waiting for page to fully load...")
+            # The fixed schedule slept 5 s in wait_for_page_load and 5 s more here
+            self.wait_for_page_load(page, tracker, fixed_delay=10)
+            
+            pin_offset, feed_cursor = self._resume_position(page, harvester, search_url)
+            
+            # Scroll to load more pins until we have enough NEW pins
+            scroll_count = 0
+            max_scrolls = 60  # Increased max scrolls
+            previous_pin_count = 0
+            stable_count = 0
+            main_pin_urls = []
+            seen_ids = set()
+            new_pins_found = 0
+            total_pins_checked = 0
+            
+            while new_pins_found < count and scroll_count < max_scrolls and not self.stop_discovery.is_set():
+                scroll_count += 1
                 
-                sleep(5)  # Increased sleep time for more content loading
+                self.logger.debug(f"Scrolling to load more pins (scroll #{scroll_count})")
+                feed_cursor = self._advance_page(page, tracker, harvester, feed_cursor)
                 
-                # Scroll to load more pins until we have enough NEW pins
-                scroll_count = 0
-                max_scrolls = 60  # Increased max scrolls
-                previous_pin_count = 0
-                stable_count = 0
-                main_pin_urls = []
-                seen_ids = set()
-                new_pins_found = 0
-                total_pins_checked = 0
+                # Extract pin URLs from current page state
+                candidates, current_pin_count = self._scan_page_for_pins(page, harvester, total_pins_checked)
+                self._record_scroll_history(search_url, pin_offset, candidates, current_pin_count)
                 
-                while new_pins_found < count and scroll_count < max_scrolls:
-                    scroll_count += 1
+                # Process new pins that appeared
+                for full_url, metadata in candidates:
+                    pin_id = self.extract_pin_id_from_url(full_url)
                     
-                    self.logger.debug(f"Scrolling to load more pins (scroll #{scroll_count})")
-                    page.mouse.wheel(0, 5000)
-                    sleep(4)
-                    
-                    # Extract pin URLs from current page state
-                    anchors = page.locator("a[href^='/pin/']").all()
-                    current_pin_count = len(anchors)
-                    
-                    # Process new pins that appeared
-                    for a in anchors[total_pins_checked:]:
-                        href = a.get_attribute("href")
-                        if href:
-                            full_url = urllib.parse.urljoin("https://www.pinterest.com", href)
-                            pin_id = self.extract_pin_id_from_url(full_url)
+                    if pin_id and pin_id not in seen_ids:
+                        seen_ids.add(pin_id)
+                        
+                        # Check if this pin is already processed (not new)
+                        if not self.is_pin_claimed(pin_id):
+                            main_pin_urls.append(full_url)
+                            if metadata:
+                                self.pin_metadata[pin_id] = metadata
+                            self._emit_pin(full_url)
+                            new_pins_found += 1
+                            self.logger.debug(f"Found NEW pin {new_pins_found}/{count}: {pin_id}")
+                            print(f"   📌 Found NEW pin {new_pins_found}/{count}: {pin_id}")
                             
-                            if pin_id and pin_id not in seen_ids:
-                                seen_ids.add(pin_id)
-                                
-                                # Check if this pin is already processed (not new)
-                                if not self.is_pin_already_processed(pin_id):
-                                    main_pin_urls.append(full_url)
-                                    new_pins_found += 1
-                                    self.logger.debug(f"Found NEW pin {new_pins_found}/{count}: {pin_id}")
-                                    print(f"   📌 Found NEW pin {new_pins_found}/{count}: {pin_id}")
-                                    
-                                    if new_pins_found >= count:
-                                        break
-                                else:
-                                    self.logger.debug(f"Skipped already processed pin: {pin_id}")
-                                    print(f"   ⏭️  Skipped duplicate pin: {pin_id}")
-                    
-                    total_pins_checked = current_pin_count
-                    
-                    # Check if we're still getting new pins from the page
-                    if current_pin_count == previous_pin_count:
-                        stable_count += 1
-                        if stable_count >= 7:  # Increased threshold
-                            self.logger.debug("No new pins loading from page, stopping scroll")
-                            print(f"   ⚠️  No more new pins available on page. Found {new_pins_found}/{count}")
-                            break
-                    else:
-                        stable_count = 0
-                    
-                    previous_pin_count = current_pin_count
-                    
-                    self.logger.debug(f"Total pins on page: {current_pin_count}, NEW pins found: {new_pins_found}/{count}")
-                    
-                    try:
-                        page.wait_for_load_state("networkidle", timeout=8000)
-                    except:
-                        pass
-
-                self.stats['main_pins_found'] = len(main_pin_urls)
-                self.logger.info(f"✅ Successfully extracted {len(main_pin_urls)} NEW main pin URLs")
-                print(f"✅ Found {len(main_pin_urls)} NEW main pins (skipped {total_pins_checked - len(main_pin_urls)} duplicates)")
+                            if new_pins_found >= count:
+                                break
+                        else:
+                            self.logger.debug(f"Skipped already processed pin: {pin_id}")
+                            print(f"   ⏭️  Skipped duplicate pin: {pin_id}")
                 
-                return main_pin_urls
+                total_pins_checked = current_pin_count
                 
-            except Exception as e:
-                self.logger.error(f"Error during main pin search: {e}")
-                return []
-            finally:
-                browser.close()
+                # Check if we're still getting new pins from the page
+                if current_pin_count == previous_pin_count:
+                    stable_count += 1
+                    if stable_count >= self.pacer.max_idle_scrolls:
+                        self.logger.debug("No new pins loading from page, stopping scroll")
+                        print(f"   ⚠️  No more new pins available on page. Found {new_pins_found}/{count}")
+                        break
+                else:
+                    stable_count = 0
+                
+                previous_pin_count = current_pin_count
+                
+                self.logger.debug(f"Total pins on page: {current_pin_count}, NEW pins found: {new_pins_found}/{count}")
+
+            self._finish_scroll_history(search_url, harvester, pin_offset + total_pins_checked)
+            self.stats['main_pins_found'] += len(main_pin_urls)
+            self.logger.info(f"✅ Successfully extracted {len(main_pin_urls)} NEW main pin URLs")
+            print(f"✅ Found {len(main_pin_urls)} NEW main pins (skipped {total_pins_checked - len(main_pin_urls)} duplicates)")
+            
+            return main_pin_urls
+            
+        except Exception as e:
+            self.logger.error(f"Error during main pin search: {e}")
+            return []
+        finally:
+            self.browser_pool.release_page(page)
 
-    def get_similar_pins_from_pin_page(self, pin_url, count=30):
-        """Get similar pins from a specific pin page - continues until we have enough NEW pins"""
+    def _load_pin_page(self, page, pin_url):
+        """Set up discovery routing, harvester and pacing on a page and open the pin; returns (harvester, tracker)"""
+        self.route_policy.apply(page, "discovery")
+        harvester = self._attach_harvester(page)
+        tracker = self.pacer.attach(page)
+        
+        self.logger.debug(f"Navigating to pin page: {pin_url}")
+        page.goto(pin_url, timeout=30000)
+        
+        page.evaluate("document.body.style.zoom = '0.25'")
+        self.wait_for_page_load(page, tracker)
+        return harvester, tracker
+
+    def get_similar_pins_from_pin_page(self, pin_url, count=30, seen_ids=None):
+        """Get similar pins from a specific pin page - continues until we have enough NEW pins
+        
+        Pass seen_ids to share one dedup set across several pin pages.
+        """
         pin_id = self.extract_pin_id_from_url(pin_url)
         self.logger.debug(f"Getting {count} NEW similar pins from pin {pin_id}")
         
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(headless=True)
-            # Create context with default zoom set to 25%
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                device_scale_factor=0.25  # Set default zoom to 25%
-            )
-            page = context.new_page()
+        page = self.browser_pool.acquire_page()
+        
+        try:
+            harvester, tracker = self._load_pin_page(page, pin_url)
+            pin_offset, feed_cursor = self._resume_position(page, harvester, pin_url)
             
-            try:
-                self.logger.debug(f"Navigating to pin page: {pin_url}")
-                page.goto(pin_url, timeout=30000)
-                
-                page.evaluate("document.body.style.zoom = '0.25'")
-                self.wait_for_page_load(page)
-                
-                scroll_count = 0
-                max_scrolls = 40  # Increased max scrolls
-                similar_pins = []
-                previous_similar_count = 0
-                stable_count = 0
-                seen_ids = set()
-                new_pins_found = 0
-                total_pins_checked = 0
-                
-                while new_pins_found < count and scroll_count < max_scrolls:
-                    scroll_count += 1
-                    page.mouse.wheel(0, 4000)
-                    sleep(4)
+            scroll_count = 0
+            max_scrolls = 40  # Increased max scrolls
+            similar_pins = []
+            previous_similar_count = 0
+            stable_count = 0
+            seen_ids = set() if seen_ids is None else seen_ids
+            new_pins_found = 0
+            total_pins_checked = 0
+            
+            while new_pins_found < count and scroll_count < max_scrolls and not self.stop_discovery.is_set():
+                scroll_count += 1
+                feed_cursor = self._advance_page(page, tracker, harvester, feed_cursor)
 
-                    anchors = page.locator("a[href^='/pin/']").all()
-                    current_total_pins = len(anchors)
+                candidates, current_total_pins = self._scan_page_for_pins(page, harvester, total_pins_checked)
+                self._record_scroll_history(pin_url, pin_offset, candidates, current_total_pins)
+                
+                # Process new pins that appeared
+                for full_url, metadata in candidates:
+                    similar_pin_id = self.extract_pin_id_from_url(full_url)
                     
-                    # Process new pins that appeared
-                    for a in anchors[total_pins_checked:]:
-                        href = a.get_attribute("href")
-                        if href:
-                            full_url = urllib.parse.urljoin("https://www.pinterest.com", href)
-                            similar_pin_id = self.extract_pin_id_from_url(full_url)
+                    if similar_pin_id and similar_pin_id != pin_id and similar_pin_id not in seen_ids:
+                        seen_ids.add(similar_pin_id)
+                        
+                        # Check if this pin is already processed (not new)
+                        if not self.is_pin_claimed(similar_pin_id):
+                            similar_pins.append(full_url)
+                            self.pin_parents[similar_pin_id] = pin_id
+                            if metadata:
+                                self.pin_metadata[similar_pin_id] = metadata
+                            self._emit_pin(full_url)
+                            new_pins_found += 1
+                            self.logger.debug(f"Found NEW similar pin {new_pins_found}/{count}: {similar_pin_id}")
                             
-                            if similar_pin_id and similar_pin_id != pin_id and similar_pin_id not in seen_ids:
-                                seen_ids.add(similar_pin_id)
-                                
-                                # Check if this pin is already processed (not new)
-                                if not self.is_pin_already_processed(similar_pin_id):
-                                    similar_pins.append(full_url)
-                                    new_pins_found += 1
-                                    self.logger.debug(f"Found NEW similar pin {new_pins_found}/{count}: {similar_pin_id}")
-                                    
-                                    if new_pins_found >= count:
-                                        break
-                                else:
-                                    self.logger.debug(f"Skipped already processed similar pin: {similar_pin_id}")
-                    
-                    total_pins_checked = current_total_pins
-                    
-                    # Check if we're still getting new pins from the page
-                    if current_total_pins == previous_similar_count:
-                        stable_count += 1
-                        if stable_count >= 7:  # Increased threshold
-                            self.logger.debug(f"No new similar pins loading from page. Found {new_pins_found}/{count}")
-                            break
-                    else:
-                        stable_count = 0
-                    
-                    previous_similar_count = current_total_pins
-                    
-                    try:
-                        page.wait_for_load_state("networkidle", timeout=3000)
-                    except:
-                        pass
+                            if new_pins_found >= count:
+                                break
+                        else:
+                            self.logger.debug(f"Skipped already processed similar pin: {similar_pin_id}")
                 
-                self.logger.debug(f"Found {len(similar_pins)} NEW similar pins for pin {pin_id}")
-                return similar_pins
+                total_pins_checked = current_total_pins
                 
-            except Exception as e:
-                self.logger.error(f"Error getting similar pins from {pin_id}: {e}")
-                return []
-            finally:
-                browser.close()
+                # Check if we're still getting new pins from the page
+                if current_total_pins == previous_similar_count:
+                    stable_count += 1
+                    if stable_count >= self.pacer.max_idle_scrolls:
+                        self.logger.debug(f"No new similar pins loading from page. Found {new_pins_found}/{count}")
+                        break
+                else:
+                    stable_count = 0
+                
+                previous_similar_count = current_total_pins
+                self.checkpoint.record_scroll(self.current_keyword, pin_url, scroll_count, similar_pins)
+                
+                if self.memory_governor.due(scroll_count) and self.memory_governor.needs_recycle(self.memory_governor.js_heap_mb(page), pin_id):
+                    # Everything harvested so far is already in similar_pins/seen_ids
+                    previous_harvester, harvested = harvester, pin_offset + total_pins_checked
+                    self.browser_pool.release_page(page)
+                    self.browser_pool.recycle_context()
+                    page = self.browser_pool.acquire_page()
+                    harvester, tracker = self._load_pin_page(page, pin_url)
+                    total_pins_checked = previous_similar_count = stable_count = 0
+                    pin_offset, feed_cursor = self._restore_position(page, harvester, previous_harvester, harvested)
+            
+            self._finish_scroll_history(pin_url, harvester, pin_offset + total_pins_checked)
+            self.checkpoint.record_expanded(self.current_keyword, pin_url, similar_pins)
+            self.logger.debug(f"Found {len(similar_pins)} NEW similar pins for pin {pin_id}")
+            return similar_pins
+            
+        except Exception as e:
+            self.logger.error(f"Error getting similar pins from {pin_id}: {e}")
+            return []
+        finally:
+            self.browser_pool.release_page(page)
 
-    def collect_all_pins(self, keyword, main_count=5, similar_count=None):
+    def collect_all_pins(self, keyword, main_count=5, similar_count=None, max_depth=1, pin_budget=None):
         """Collect main pins and optionally their similar pins - ensures we get the exact count requested
         
         Args:
             keyword: Search keyword
             main_count: Number of NEW main pins to collect
             similar_count: Number of NEW similar pins per main pin (None to skip similar pins)
+            max_depth: Levels of similar pins to crawl; above 1 uses the crawl frontier
+            pin_budget: Stop once this many NEW pins are collected (crawl frontier)
         """
+        self.current_keyword = keyword
+        if similar_count is not None and (max_depth > 1 or pin_budget is not None):
+            return self.collect_pins_with_frontier(keyword, main_count, similar_count, max_depth, pin_budget)
+        
         self.logger.info(f"🚀 Starting pin collection")
         print(f"🚀 Starting Pinterest scraping")
         
-        # Step 1: Get main pins (ensures we get exactly main_count NEW pins)
-        main_pins = self.get_main_pins_from_search(keyword, main_count)
+        resumed = self.resume and self.checkpoint.has_progress(keyword)
+        if resumed:
+            state = self.checkpoint.keyword_state(keyword)
+            main_pins = state['main_pins']
+            # Pins collected before the interruption must not be counted as NEW again
+            self.scheduled_pins.update(self.extract_pin_id_from_url(url) for url in state['pending'])
+            self.logger.info(f"♻️ Resuming '{keyword}': {len(main_pins)} main pins, {len(state['expanded'])} pages expanded, {len(state['pending'])} pins pending")
+            print(f"♻️ Resuming from checkpoint: {len(main_pins)} main pins, {len(state['pending'])} pins pending download")
+            if state['in_flight']:
+                self.logger.info(f"{len(state['in_flight'])} downloads were interrupted and will be retried")
+        else:
+            # Step 1: Get main pins (ensures we get exactly main_count NEW pins)
+            main_pins = self.get_main_pins_from_search(keyword, main_count)
+            self.checkpoint.record_main_pins(keyword, main_pins)
         
         if not main_pins:
             self.logger.error("No main pins found")
@@ -417,144 +3694,493 @@ class PinterestScraper:
         
         # Step 2: Get similar pins if requested
         if similar_count is not None:
-            self.logger.info(f"🔍 STEP 2: Getting {similar_count} NEW similar pins from each of {len(main_pins)} main pins")
+            # Expand on-topic main pins first and drop the off-topic ones
+            pins_to_expand = [pin_url for pin_url, _ in self.rank_pins_by_relevance(keyword, main_pins)]
+            expand_counts = [similar_count] * len(pins_to_expand)
+            
+            if resumed:
+                # Fully expanded pages are done; half-expanded ones only need the rest of their quota
+                state = self.checkpoint.keyword_state(keyword)
+                for similar_pins in state['expanded'].values():
+                    all_pin_urls.update(similar_pins)
+                for progress in state['scroll_progress'].values():
+                    all_pin_urls.update(progress['found'])
+                remaining = [
+                    (pin_url, similar_count - len(state['scroll_progress'].get(pin_url, {}).get('found', [])))
+                    for pin_url in pins_to_expand
+                    if pin_url not in state['expanded']
+                ]
+                pins_to_expand = [pin_url for pin_url, count in remaining if count > 0]
+                expand_counts = [count for _, count in remaining if count > 0]
+            
+            self.logger.info(f"🔍 STEP 2: Getting {similar_count} NEW similar pins from each of {len(pins_to_expand)} main pins")
             print(f"\n🔍 STEP 2: Getting {similar_count} NEW similar pins from each main pin")
             
-            for i, main_pin_url in enumerate(main_pins, 1):
-                pin_id = self.extract_pin_id_from_url(main_pin_url)
-                self.logger.info(f"Processing main pin {i}/{len(main_pins)}: {pin_id}")
-                print(f"   📌 Processing main pin {i}/{len(main_pins)}: {pin_id}")
+            if self.similar_concurrency > 1:
+                # Expand main pins concurrently with one dedup set shared by all pages
+                seen_ids = {self.extract_pin_id_from_url(url) for url in main_pins}
+                results = self.similar_expander.expand(pins_to_expand, expand_counts, seen_ids)
+                for similar_pins in results:
+                    all_pin_urls.update(similar_pins)
+            else:
+                for i, (main_pin_url, count) in enumerate(zip(pins_to_expand, expand_counts), 1):
+                    if self.stop_discovery.is_set():
+                        break
+                    pin_id = self.extract_pin_id_from_url(main_pin_url)
+                    self.logger.info(f"Processing main pin {i}/{len(pins_to_expand)}: {pin_id}")
+                    print(f"   📌 Processing main pin {i}/{len(pins_to_expand)}: {pin_id}")
                 
-                # Get exactly similar_count NEW similar pins for this main pin
-                similar_pins = self.get_similar_pins_from_pin_page(main_pin_url, similar_count)
+                    # Get exactly similar_count NEW similar pins for this main pin
+                    similar_pins = self.get_similar_pins_from_pin_page(main_pin_url, count)
                 
-                before_count = len(all_pin_urls)
-                all_pin_urls.update(similar_pins)
-                after_count = len(all_pin_urls)
-                new_pins = after_count - before_count
+                    before_count = len(all_pin_urls)
+                    all_pin_urls.update(similar_pins)
+                    after_count = len(all_pin_urls)
+                    new_pins = after_count - before_count
                 
-                self.logger.debug(f"Added {new_pins} new similar pins from main pin {pin_id}")
-                print(f"      ➕ Added {len(similar_pins)} NEW similar pins from this main pin")
+                    self.logger.debug(f"Added {new_pins} new similar pins from main pin {pin_id}")
+                    print(f"      ➕ Added {len(similar_pins)} NEW similar pins from this main pin")
                 
-                sleep(1)
+                    sleep(1)
             
-            self.stats['similar_pins_found'] = len(all_pin_urls) - len(main_pins)
+            similar_found = len(all_pin_urls) - len(main_pins)
+            self.stats['similar_pins_found'] += similar_found
         else:
             self.logger.info("⏭️ Skipping similar pins extraction as per user request")
             print(f"\n⏭️ Skipping similar pins extraction as per user choice")
-            self.stats['similar_pins_found'] = 0
+            similar_found = 0
         
-        self.stats['total_unique_pins'] = len(all_pin_urls)
+        self.stats['total_unique_pins'] += len(all_pin_urls)
         
         self.logger.info(f"✅ Total unique pins collected: {len(all_pin_urls)}")
         print(f"\n✅ Collection complete:")
         print(f"   📊 Main pins: {len(main_pins)}")
-        print(f"   📊 Similar pins: {self.stats['similar_pins_found']}")
+        print(f"   📊 Similar pins: {similar_found}")
         print(f"   📊 Total unique pins: {len(all_pin_urls)}")
         
         return list(all_pin_urls)
 
+    def rank_pins_by_relevance(self, keyword, pin_urls):
+        """Return [(pin_url, score)] best first, without pins scoring below min_relevance"""
+        scorer = RelevanceScorer(keyword, self.synonyms)
+        scored = [
+            (pin_url, scorer.score(self.pin_metadata.get(self.extract_pin_id_from_url(pin_url))))
+            for pin_url in pin_urls
+        ]
+        # sorted() is stable, so equal scores keep search order
+        scored = sorted(scored, key=lambda item: item[1], reverse=True)
+        
+        relevant = [(pin_url, score) for pin_url, score in scored if score >= self.min_relevance]
+        skipped = len(scored) - len(relevant)
+        if skipped:
+            self.stats['low_relevance_skipped'] += skipped
+            self.logger.info(f"Skipping expansion of {skipped} off-topic pins (relevance < {self.min_relevance})")
+            print(f"   ⏭️  Skipping {skipped} off-topic pins for similar-pin expansion")
+        return relevant
+
+    def collect_pins_with_frontier(self, keyword, main_count=5, fanout=20, max_depth=2, pin_budget=None):
+        """Crawl similar pins up to max_depth levels, most productive branches first
+        
+        Args:
+            keyword: Search keyword
+            main_count: Number of NEW main pins to seed the frontier with
+            fanout: NEW similar pins to request per expanded pin (int, or list per depth)
+            max_depth: Deepest level of similar pins to collect
+            pin_budget: Stop once this many NEW pins are collected (None for no limit)
+        """
+        self.logger.info(f"🚀 Starting frontier crawl - depth {max_depth}, fan-out {fanout}, budget {pin_budget}")
+        print(f"🚀 Starting Pinterest frontier crawl (depth {max_depth}, budget {pin_budget})")
+        
+        resumed = self.resume and self.checkpoint.has_progress(keyword)
+        if resumed:
+            state = self.checkpoint.keyword_state(keyword)
+            main_pins = state['main_pins']
+            # Pins collected before the interruption must not be counted as NEW again
+            self.scheduled_pins.update(self.extract_pin_id_from_url(url) for url in state['pending'])
+        else:
+            main_pins = self.get_main_pins_from_search(keyword, main_count)
+            self.checkpoint.record_main_pins(keyword, main_pins)
+        if not main_pins:
+            self.logger.error("No main pins found")
+            print("❌ No main pins found")
+            return []
+        
+        frontier = CrawlFrontier(max_depth=max_depth, fanout=fanout, pin_budget=pin_budget)
+        scorer = RelevanceScorer(keyword, self.synonyms)
+        saved_frontier = self.checkpoint.keyword_state(keyword).get('frontier') if resumed else None
+        if saved_frontier:
+            # Pins of the wave that was interrupted are still queued, so they are expanded again
+            frontier.restore(saved_frontier)
+            self.logger.info(f"♻️ Resuming '{keyword}' frontier: {len(frontier)} pins queued, {len(frontier.collected)} collected")
+            print(f"♻️ Resuming frontier crawl: {len(frontier)} pins queued, {len(frontier.collected)} collected")
+        else:
+            for main_pin_url, relevance in self.rank_pins_by_relevance(keyword, main_pins):
+                frontier.add(main_pin_url, self.extract_pin_id_from_url(main_pin_url), depth=0, score=relevance)
+            for main_pin_url in main_pins:
+                # Off-topic main pins are still downloaded, just never expanded
+                frontier.add(main_pin_url, self.extract_pin_id_from_url(main_pin_url), depth=0, score=0, expand=False)
+            self.checkpoint.record_frontier(keyword, frontier.to_state())
+        
+        # Shared with the pin pages so no two pages claim the same pin
+        seen_ids = set(frontier.visited)
+        wave_size = max(1, self.similar_concurrency)
+        
+        while len(frontier) and frontier.budget_left > 0 and not self.stop_discovery.is_set():
+            wave = frontier.pop_wave(wave_size)
+            wave_urls = [pin_url for pin_url, _, _ in wave]
+            wave_counts = [requested for _, _, requested in wave]
+            
+            self.logger.info(f"Expanding {len(wave)} pins ({len(frontier)} queued, {len(frontier.collected)} collected)")
+            if self.similar_concurrency > 1:
+                results = self.similar_expander.expand(wave_urls, wave_counts, seen_ids)
+            else:
+                results = [
+                    self.get_similar_pins_from_pin_page(pin_url, requested, seen_ids)
+                    for pin_url, requested in zip(wave_urls, wave_counts)
+                ]
+            
+            for (pin_url, depth, requested), similar_pins in zip(wave, results):
+                frontier.stats['expansions'] += 1
+                # On-topic children of pages that filled their quota get expanded first
+                yield_ratio = len(similar_pins) / requested if requested else 0
+                for similar_url in similar_pins:
+                    similar_id = self.extract_pin_id_from_url(similar_url)
+                    relevance = scorer.score(self.pin_metadata.get(similar_id))
+                    if relevance < self.min_relevance:
+                        self.stats['low_relevance_skipped'] += 1
+                    frontier.add(similar_url, similar_id, depth + 1, yield_ratio * relevance,
+                                 expand=relevance >= self.min_relevance)
+                self.logger.debug(f"Depth {depth} pin yielded {len(similar_pins)}/{requested} NEW pins")
+            self.checkpoint.record_frontier(keyword, frontier.to_state())
+        
+        self.stats['main_pins_found'] += len(main_pins)
+        self.stats['similar_pins_found'] += len(frontier.collected) - len(main_pins)
+        self.stats['total_unique_pins'] += len(frontier.collected)
+        
+        self.logger.info(
+            f"✅ Frontier crawl collected {len(frontier.collected)} pins with {frontier.stats['expansions']} expansions, "
+            f"deepest level {frontier.stats['deepest_level']}"
+        )
+        print("\n✅ Collection complete:")
+        print(f"   📊 Main pins: {len(main_pins)}")
+        print(f"   📊 Similar pins: {len(frontier.collected) - len(main_pins)}")
+        print(f"   📊 Pin pages expanded: {frontier.stats['expansions']}")
+        print(f"   📊 Deepest level: {frontier.stats['deepest_level']}")
+        
+        return frontier.collected
+
+    def _resolution_key(self, image_url):
+        """(size-independent image key, URL pattern) of an i.pinimg.com URL"""
+        parts = urllib.parse.urlsplit(self.IMAGE_SIZE_SEGMENT.sub("/", image_url, count=1))
+        extension = os.path.splitext(parts.path)[1].lower()
+        return parts.netloc + parts.path, (parts.netloc, extension)
+
+    def _record_resolution(self, image_url, found):
+        """Remember whether the size in image_url exists for that image"""
+        match = self.IMAGE_SIZE_SEGMENT.search(image_url)
+        if not match:
+            return
+        key, pattern = self._resolution_key(image_url)
+        if found:
+            self.resolution_cache.put(key, match.group(1))
+        if match.group(1) == "originals":
+            self.resolution_cache.record_pattern(pattern, found)
+
+    def resolution_candidates(self, image_url):
+        """URLs to GET for an image, best first: known size, originals/1200x, then the URL itself"""
+        original_url = self.IMAGE_SIZE_SEGMENT.sub("/originals/", image_url, count=1)
+        fallback_url = self.IMAGE_SIZE_SEGMENT.sub("/1200x/", image_url, count=1)
+        key, pattern = self._resolution_key(image_url)
+        
+        candidates = [original_url, fallback_url]
+        if not self.resolution_cache.prefer_originals(pattern):
+            candidates.reverse()
+        cached_size = self.resolution_cache.get(key)
+        if cached_size:
+            candidates.insert(0, self.IMAGE_SIZE_SEGMENT.sub(f"/{cached_size}/", image_url, count=1))
+        return list(dict.fromkeys(candidates + [image_url]))
+
     def get_highest_quality_url(self, image_url):
-        """Try 'originals' first, fallback to 1200x"""
+        """Probe with HEAD whether originals exist, fallback to 1200x (result cached per image)"""
         self.logger.debug(f"Getting highest quality URL for: {image_url}")
         
-        original_url = image_url.replace("/600x/", "/originals/")
+        key, _ = self._resolution_key(image_url)
+        cached_size = self.resolution_cache.get(key)
+        if cached_size:
+            return self.IMAGE_SIZE_SEGMENT.sub(f"/{cached_size}/", image_url, count=1)
+        
+        original_url = self.IMAGE_SIZE_SEGMENT.sub("/originals/", image_url, count=1)
         
         try:
-            response = self.session.head(original_url, timeout=10)
+            self.stats['image_round_trips'] += 1
+            with self.host_limiter.slot(original_url) as request:
+                response = self.session.head(original_url, timeout=10)
+                request.record(response)
             if response.status_code == 200:
                 self.logger.debug("Original quality URL available")
+                self._record_resolution(original_url, True)
                 return original_url
             else:
                 self.logger.debug(f"Original quality not available (status: {response.status_code}), trying 1200x")
+                if response.status_code in self.MISSING_RESOLUTION_STATUSES:
+                    self._record_resolution(original_url, False)
         except Exception as e:
             self.logger.debug(f"Error checking original quality: {e}")
         
-        fallback_url = image_url.replace("/600x/", "/1200x/")
+        fallback_url = self.IMAGE_SIZE_SEGMENT.sub("/1200x/", image_url, count=1)
         self.logger.debug(f"Using fallback 1200x URL: {fallback_url}")
         return fallback_url
 
+    def probe_resolutions(self, image_urls, workers=8):
+        """HEAD many images concurrently to fill the resolution cache before downloading"""
+        if not image_urls:
+            return
+        self.logger.info(f"Probing originals for {len(image_urls)} known image URLs")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ResolutionProbe") as executor:
+            list(executor.map(self.get_highest_quality_url, image_urls))
+
+    def fetch_pin_meta(self, pin_url, max_bytes=1024 * 1024):
+        """Read og:image/title/description from the pin page HTML over plain HTTP.
+
+        Streams the response and stops as soon as <head> is parsed. Returns None if
+        the page has no og:image (e.g. a login wall) so the caller can use the browser.
+        """
+        parser = PinPageMetaParser()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        try:
+            with self.host_limiter.slot(pin_url) as request, \
+                    self.session.get(pin_url, headers=self.PAGE_HEADERS, timeout=(5, 15), stream=True) as response:
+                request.record(response)
+                response.raise_for_status()
+                read = 0
+                for chunk in response.iter_content(chunk_size=16384):
+                    parser.feed(decoder.decode(chunk))
+                    read += len(chunk)
+                    if parser.done or read >= max_bytes:
+                        break
+        except Exception as e:
+            self.logger.debug(f"HTTP metadata fetch failed for {pin_url}: {e}")
+            return None
+
+        return parser.meta if parser.meta.get('image_url') else None
+
     def extract_image_url(self, pin_url):
-        """Extract og:image from the pin page"""
+        """Get the pin's og:image - from feed/grid metadata, plain HTTP, or the browser as a last resort"""
+        pin_id = self.extract_pin_id_from_url(pin_url)
+        metadata = self.pin_metadata.get(pin_id)
+        if metadata and metadata.get('image_url'):
+            self.logger.debug(f"Using {metadata['source']} image URL for pin {pin_id}: {metadata['image_url']}")
+            self.stats['image_urls_from_feed'] += 1
+            return metadata['image_url']
+        
+        start = time.monotonic()
+        meta = self.fetch_pin_meta(pin_url)
+        if meta:
+            self.stats['meta_http_hits'] += 1
+            self.stats['meta_http_seconds'] += time.monotonic() - start
+            self.logger.debug(f"Got image URL over HTTP for pin {pin_id}: {meta['image_url']}")
+            if metadata is None:
+                self.pin_metadata[pin_id] = dict(meta, url=pin_url, alt='', source='http')
+            return meta['image_url']
+        
+        self.stats['meta_browser_fallbacks'] += 1
         self.logger.debug(f"Extracting image URL from pin page: {pin_url}")
         
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(headless=True)
-            page = browser.new_page()
+        start = time.monotonic()
+        page = self.browser_pool.acquire_page()
+        self.route_policy.apply(page, "download")
+        
+        try:
+            self.logger.debug("Navigating to pin page")
+            with self.host_limiter.slot(pin_url) as request:
+                request.record(page.goto(pin_url, timeout=30000))
             
-            try:
-                self.logger.debug("Navigating to pin page")
-                page.goto(pin_url, timeout=30000)
-                
-                self.logger.debug("Waiting for og:image meta tag")
-                page.wait_for_selector("meta[property='og:image']", state="attached", timeout=15000)
-                
-                image_url = page.locator("meta[property='og:image']").get_attribute("content")
-                
-                if image_url:
-                    self.logger.debug(f"Successfully extracted image URL: {image_url}")
-                else:
-                    self.logger.warning("og:image meta tag found but no content")
-                    
-            except Exception as e:
-                self.logger.error(f"Error extracting image URL: {e}")
-                image_url = None
-            finally:
-                browser.close()
+            self.logger.debug("Waiting for og:image meta tag")
+            page.wait_for_selector("meta[property='og:image']", state="attached", timeout=15000)
+            
+            image_url = page.locator("meta[property='og:image']").get_attribute("content")
             
-            return image_url
+            if image_url:
+                self.logger.debug(f"Successfully extracted image URL: {image_url}")
+            else:
+                self.logger.warning("og:image meta tag found but no content")
+                
+        except Exception as e:
+            self.logger.error(f"Error extracting image URL: {e}")
+            image_url = None
+        finally:
+            self.browser_pool.release_page(page)
+            self.stats['meta_browser_seconds'] += time.monotonic() - start
+        
+        return image_url
 
-    def download_image(self, pin_url):
-        """Download image from pin URL"""
+    def download_image(self, pin_url, keyword=None):
+        """Download image from pin URL; failures are requeued with backoff or dead-lettered"""
         pin_id = self.extract_pin_id_from_url(pin_url)
         if not pin_id:
             self.logger.error(f"❌ Skipped invalid URL: {pin_url}")
+            self.forget_processed_pin(keyword, pin_url, None)
             return False
 
         if self.is_pin_already_processed(pin_id):
             self.stats['skipped_duplicates'] += 1
+            self.forget_processed_pin(keyword, pin_url, pin_id)
             return False
 
         self.logger.info(f"Processing pin: {pin_id}")
         
         image_url = self.extract_image_url(pin_url)
         if not image_url:
-            self.logger.error(f"Could not extract image URL for pin {pin_id}")
-            self.stats['failed_downloads'] += 1
+            failure = DownloadFailure('no_image_url', "could not extract image URL")
+            self._download_failed(pin_url, pin_id, keyword, failure, None)
             return False
 
-        final_url = self.get_highest_quality_url(image_url)
+        file_path = os.path.join(self.SAVE_FOLDER, f"{pin_id}.jpg")
+        temp_path = f"{file_path}.part"
         
         try:
-            self.logger.info(f"Downloading image from: {final_url}")
-            response = self.session.get(final_url, timeout=30)
-            response.raise_for_status()
-            
-            img_data = response.content
-            file_path = os.path.join(self.SAVE_FOLDER, f"{pin_id}.jpg")
-            
-            with open(file_path, "wb") as f:
-                f.write(img_data)
+            # Speculative GET on the best candidate; a 403/404 just moves on to the next size.
+            # HEAD-then-GET always took two round trips per image
+            candidates = self.resolution_candidates(image_url)
+            self.stats['image_round_trips_baseline'] += 2
+            for final_url in candidates:
+                host = urllib.parse.urlsplit(final_url).netloc
+                if not self.circuit_breaker.allow(host):
+                    raise DownloadFailure('circuit_open', f"circuit open for {host}", host=host)
+                
+                self.logger.info(f"Downloading image from: {final_url}")
+                self.stats['image_round_trips'] += 1
+                checksum = hashlib.sha256()
+                file_size = 0
+                
+                try:
+                    # Stream in chunks so memory stays flat however many downloads run at once
+                    with self.host_limiter.slot(final_url) as request, self.session.get(final_url, timeout=30, stream=True) as response:
+                        request.record(response)
+                        if response.status_code in self.MISSING_RESOLUTION_STATUSES and final_url != candidates[-1]:
+                            self.logger.debug(f"Not available (status: {response.status_code}), trying next size")
+                            self._record_resolution(final_url, False)
+                            self.circuit_breaker.record(host, True)
+                            continue
+                        response.raise_for_status()
+                        declared_size = int(response.headers.get('Content-Length') or 0)
+                        if declared_size > self.MAX_IMAGE_BYTES:
+                            raise DownloadFailure('too_large', f"image is {declared_size} bytes, over the {self.MAX_IMAGE_BYTES} byte limit")
+                        
+                        with open(temp_path, "wb") as f:
+                            for chunk in response.iter_content(chunk_size=64 * 1024):
+                                if not file_size and not chunk.startswith(self.IMAGE_SIGNATURES):
+                                    raise DownloadFailure('decode', f"response is not an image (starts with {chunk[:16]!r})")
+                                file_size += len(chunk)
+                                if file_size > self.MAX_IMAGE_BYTES:
+                                    raise DownloadFailure('too_large', f"image exceeded the {self.MAX_IMAGE_BYTES} byte limit")
+                                checksum.update(chunk)
+                                f.write(chunk)
+                        if not file_size:
+                            raise DownloadFailure('decode', "empty response body")
+                except Exception as e:
+                    failure = DownloadFailure.classify(e, host)
+                    self.circuit_breaker.record(host, not failure.counts_against_host)
+                    if failure is e:
+                        raise
+                    raise failure from e
+                
+                self.circuit_breaker.record(host, True)
+                self._record_resolution(final_url, True)
+                break
             
-            self.mark_pin_as_processed(pin_id)
+            # Renamed into place and marked processed once its commit batch is fsynced
+            details = {'keyword': keyword, 'pin_url': pin_url, 'image_url': final_url}
+            self.file_committer.add(pin_id, temp_path, file_path, file_size, checksum.hexdigest(), details)
             
-            file_size = len(img_data)
             self.logger.info(f"Successfully downloaded pin {pin_id} - Size: {file_size} bytes")
             self.stats['successful_downloads'] += 1
+            self.retry_queue.succeeded(pin_url)
             return True
             
         except Exception as e:
-            self.logger.error(f"Download failed for pin {pin_id}: {e}")
-            self.stats['failed_downloads'] += 1
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self._download_failed(pin_url, pin_id, keyword, DownloadFailure.classify(e), image_url)
             return False
 
-    def run(self, keyword, main_count=5, similar_count=None):
+    def _download_failed(self, pin_url, pin_id, keyword, failure, image_url):
+        """Hand a failed pin to the retry queue; count it as failed only once it is dead-lettered"""
+        not_before = self.circuit_breaker.retry_in(failure.host) if failure.kind == 'circuit_open' else 0.0
+        delay = self.retry_queue.failed(pin_url, keyword, failure, image_url, not_before)
+        if delay is None:
+            self.logger.error(f"Download failed for pin {pin_id} ({failure.kind}): {failure} - moved to dead letters")
+            self.stats['failed_downloads'] += 1
+            # The dead-letter file owns the pin now (--replay-dead-letters), a resume shouldn't queue it again
+            self.checkpoint.finish_download(keyword, pin_url, True)
+        else:
+            self.logger.warning(f"Download failed for pin {pin_id} ({failure.kind}): {failure} - retrying in {delay:.1f}s")
+            self.stats['download_retries'] += 1
+
+    def download_pins(self, pin_urls, keyword=None):
+        """Download every collected pin that isn't processed yet"""
+        label = f" for '{keyword}'" if keyword else ""
+        self.logger.info(f"🔽 STEP 3: Downloading {len(pin_urls)} pins{label} ({self.download_concurrency} in flight)")
+        print(f"\n🔽 STEP 3: Downloading {len(pin_urls)} pins{label}")
+        
+        if self.probe_originals:
+            known_urls = [
+                self.pin_metadata[pin_id]['image_url']
+                for pin_id in map(self.extract_pin_id_from_url, pin_urls)
+                if self.pin_metadata.get(pin_id, {}).get('image_url')
+            ]
+            self.probe_resolutions(known_urls, workers=self.download_concurrency)
+        
+        self.download_engine.run(pin_urls, keyword)
+        self.file_committer.flush()
+        self.save_processed_pins()
+        
+        # Downloaded or failed - either way the pins are no longer queued
+        self.scheduled_pins.difference_update(self.extract_pin_id_from_url(url) for url in pin_urls)
+
+    def replay_dead_letters(self):
+        """Retry every dead-lettered pin - no crawling, and no pin page visit when its image URL is known"""
+        records = self.retry_queue.take_dead_letters()
+        if not records:
+            self.logger.info("No dead letters to replay")
+            print("📭 No dead letters to replay")
+            return
+        
+        self.logger.info(f"🔁 Replaying {len(records)} dead-lettered pins")
+        print(f"🔁 Replaying {len(records)} dead-lettered pins")
+        start_time = datetime.now()
+        
+        by_keyword = {}
+        for record in records:
+            pin_id = self.extract_pin_id_from_url(record['pin_url'])
+            if record.get('image_url') and pin_id not in self.pin_metadata:
+                self.pin_metadata[pin_id] = {'image_url': record['image_url'], 'url': record['pin_url'], 'source': 'dead-letter'}
+            by_keyword.setdefault(record.get('keyword'), []).append(record['pin_url'])
+        
+        try:
+            for keyword, pin_urls in by_keyword.items():
+                self.download_pins(pin_urls, keyword)
+            self.retry_queue.finish_replay()
+        except Exception as e:
+            self.logger.error(f"Critical error while replaying dead letters: {e}")
+            print(f"❌ Critical error: {e}")
+        
+        self.log_final_stats(start_time)
+
+    def _download_keyword(self, pin_urls, keyword):
+        """Download a keyword's pins and drop its checkpoint (batch worker)"""
+        self.download_pins(pin_urls, keyword)
+        self.checkpoint.finish_keyword(keyword)
+
+    def run(self, keyword, main_count=5, similar_count=None, max_depth=1, pin_budget=None):
         """Main execution method
         
         Args:
             keyword: Search keyword
             main_count: Number of main pins to collect
             similar_count: Number of similar pins per main pin (None to skip similar pins)
+            max_depth: Levels of similar pins to crawl
+            pin_budget: Stop collecting once this many NEW pins are found
         """
         self.logger.info(f"🚀 Starting Pinterest Multi-Level Scraper")
         if similar_count is not None:
@@ -566,7 +4192,12 @@ class PinterestScraper:
         
         try:
             # Step 1 & 2: Collect all pins
-            all_pin_urls = self.collect_all_pins(keyword, main_count, similar_count)
+            all_pin_urls = self.collect_all_pins(keyword, main_count, similar_count, max_depth, pin_budget)
+            
+            if self.resume:
+                # Whatever the interrupted run collected but never downloaded
+                pending = list(self.checkpoint.keyword_state(keyword)['pending'])
+                all_pin_urls = list(dict.fromkeys(list(all_pin_urls) + pending))
             
             if not all_pin_urls:
                 self.logger.warning("No pins collected")
@@ -574,32 +4205,169 @@ class PinterestScraper:
                 return
             
             # Step 3: Download all collected pins
-            self.logger.info(f"🔽 STEP 3: Downloading {len(all_pin_urls)} pins")
-            print(f"\n🔽 STEP 3: Downloading {len(all_pin_urls)} pins")
+            self.download_pins(all_pin_urls, keyword)
+            self.checkpoint.finish_keyword(keyword)
+                
+        except Exception as e:
+            self.logger.error(f"Critical error in run method: {e}")
+            print(f"❌ Critical error: {e}")
+        
+        self.log_final_stats(start_time)
+
+    def run_batch(self, keywords, main_count=5, similar_count=None, max_depth=1, pin_budget=None):
+        """Scrape many keywords over one browser pool and one dedup registry
+        
+        Collection for keyword k+1 runs on this thread while a background worker
+        downloads the pins of keyword k.
+        
+        Args:
+            keywords: List of search keywords
+            main_count: Number of main pins to collect per keyword
+            similar_count: Number of similar pins per main pin (None to skip similar pins)
+            max_depth: Levels of similar pins to crawl
+            pin_budget: Stop collecting a keyword once this many NEW pins are found
+        """
+        self.logger.info(f"🚀 Starting Pinterest batch run for {len(keywords)} keywords")
+        print(f"🚀 Starting Pinterest batch run for {len(keywords)} keywords")
+        
+        start_time = datetime.now()
+        download_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PinterestDownloads")
+        downloads = []
+        
+        try:
+            for i, keyword in enumerate(keywords, 1):
+                self.logger.info(f"📚 Keyword {i}/{len(keywords)}: '{keyword}'")
+                print(f"\n📚 Keyword {i}/{len(keywords)}: '{keyword}'")
+                
+                try:
+                    pin_urls = self.collect_all_pins(keyword, main_count, similar_count, max_depth, pin_budget)
+                except Exception as e:
+                    self.logger.error(f"Collection failed for keyword '{keyword}': {e}")
+                    continue
+                
+                if self.resume:
+                    # Whatever the interrupted run collected for this keyword but never downloaded
+                    pending = list(self.checkpoint.keyword_state(keyword)['pending'])
+                    pin_urls = list(dict.fromkeys(list(pin_urls) + pending))
+                
+                if not pin_urls:
+                    self.logger.warning(f"No pins collected for keyword '{keyword}'")
+                    continue
+                
+                # Claim the pins so the next keyword's collection doesn't pick them again
+                self.scheduled_pins.update(self.extract_pin_id_from_url(url) for url in pin_urls)
+                downloads.append((keyword, download_worker.submit(self._download_keyword, pin_urls, keyword)))
             
-            for i, pin_url in enumerate(all_pin_urls, 1):
-                pin_id = self.extract_pin_id_from_url(pin_url)
+            for keyword, future in downloads:
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Downloads failed for keyword '{keyword}': {e}")
+        finally:
+            # The worker's browser can only be closed from the worker thread
+            download_worker.submit(self.browser_pool.close).result()
+            download_worker.shutdown()
+        
+        self.log_final_stats(start_time)
+
+    def run_streaming(self, keyword, target, main_count=5, similar_count=None, max_depth=1, pin_budget=None,
+                      download_workers=None, queue_size=50):
+        """Download pins while they are being discovered
+        
+        Discovery runs on this thread and pushes every NEW pin into a bounded queue;
+        download workers consume it concurrently. A full queue blocks discovery
+        (backpressure), and discovery stops once `target` images have landed.
+        
+        Args:
+            keyword: Search keyword
+            target: Number of successful downloads after which discovery stops
+            main_count: Number of main pins to collect
+            similar_count: Number of similar pins per main pin (None to skip similar pins)
+            max_depth: Levels of similar pins to crawl
+            pin_budget: Stop collecting once this many NEW pins are found
+            download_workers: Number of concurrent download workers (default: download_concurrency)
+            queue_size: Maximum number of discovered pins waiting for a worker
+        """
+        download_workers = download_workers or self.download_concurrency
+        self.logger.info(f"🚀 Starting streaming run for '{keyword}' - target {target} images, {download_workers} workers")
+        print(f"🚀 Starting streaming Pinterest run - target {target} images")
+        
+        start_time = datetime.now()
+        self.stop_discovery.clear()
+        pin_queue = queue.Queue(maxsize=queue_size)
+        self.pin_sink = pin_queue.put
+        
+        workers = [
+            threading.Thread(
+                target=self._download_worker,
+                args=(pin_queue, target, start_time),
+                name=f"PinterestDownloads-{i}"
+            )
+            for i in range(1, download_workers + 1)
+        ]
+        for worker in workers:
+            worker.start()
+        
+        try:
+            self.collect_all_pins(keyword, main_count, similar_count, max_depth, pin_budget)
+            if self.resume:
+                # Pins left over from the interrupted run go to the workers too
+                for pin_url in list(self.checkpoint.keyword_state(keyword)['pending']):
+                    pin_queue.put(pin_url)
+        except Exception as e:
+            self.logger.error(f"Critical error during streaming discovery: {e}")
+            print(f"❌ Critical error: {e}")
+        finally:
+            self.pin_sink = None
+            for _ in workers:
+                pin_queue.put(None)
+            for worker in workers:
+                worker.join()
+            if self.retry_queue and not self.stop_discovery.is_set():
+                # Failures the workers backed off are retried through the download window
+                self.download_engine.run([], keyword)
+            self.file_committer.flush()
+        
+        self.checkpoint.finish_keyword(keyword)
+        self.log_final_stats(start_time)
+
+    def _download_worker(self, pin_queue, target, start_time):
+        """Consume discovered pins until the end-of-stream marker"""
+        try:
+            while True:
+                pin_url = pin_queue.get()
+                if pin_url is None:
+                    break
                 
-                if self.is_pin_already_processed(pin_id):
-                    print(f"⏭️  [{i}/{len(all_pin_urls)}] Skipped duplicate: {pin_id}")
-                    self.stats['skipped_duplicates'] += 1
+                # Target reached - keep draining so discovery never blocks on a full queue
+                if self.stop_discovery.is_set():
                     continue
                 
-                print(f"📥 [{i}/{len(all_pin_urls)}] Downloading: {pin_id}")
-                success = self.download_image(pin_url)
+                pin_id = self.extract_pin_id_from_url(pin_url)
+                if pin_id is None or self.is_pin_already_processed(pin_id):
+                    self.forget_processed_pin(self.current_keyword, pin_url, pin_id)
+                    continue
                 
+                print(f"📥 Downloading: {pin_id}")
+                self.checkpoint.start_download(self.current_keyword, pin_url)
+                success = self.download_image(pin_url, self.current_keyword)
+                self.checkpoint.end_attempt(self.current_keyword, pin_url)
                 if success:
                     print(f"✅ Downloaded: {pin_id}")
+                    if self.stats['first_image_seconds'] is None:
+                        self.stats['first_image_seconds'] = (datetime.now() - start_time).total_seconds()
+                        self.logger.info(f"First image landed after {self.stats['first_image_seconds']:.1f}s")
+                    if self.stats['successful_downloads'] >= target:
+                        self.logger.info(f"🎯 Target of {target} images reached - stopping discovery")
+                        self.stop_discovery.set()
                 else:
                     print(f"❌ Failed: {pin_id}")
-                
-                sleep(0.5)
-                
-        except Exception as e:
-            self.logger.error(f"Critical error in run method: {e}")
-            print(f"❌ Critical error: {e}")
-        
-        # Final statistics
+        finally:
+            # Each worker thread owns its fallback browser
+            self.browser_pool.close()
+
+    def log_final_stats(self, start_time):
+        """Log and print the statistics of a completed run"""
         end_time = datetime.now()
         duration = end_time - start_time
         
@@ -611,7 +4379,39 @@ class PinterestScraper:
         self.logger.info(f"Successful downloads: {self.stats['successful_downloads']}")
         self.logger.info(f"Skipped duplicates: {self.stats['skipped_duplicates']}")
         self.logger.info(f"Failed downloads: {self.stats['failed_downloads']}")
+        self.logger.info(f"Download retries: {self.stats['download_retries']}")
+        self.logger.info(f"Image URLs known without a pin page visit: {self.stats['image_urls_from_feed']}")
+        self.logger.info(f"Off-topic pins not expanded: {self.stats['low_relevance_skipped']}")
+        self.logger.info(f"Already harvested pins skipped: {self.stats['history_pins_skipped']}")
+        meta_lookups = self.stats['meta_http_hits'] + self.stats['meta_browser_fallbacks']
+        if meta_lookups:
+            http_avg = self.stats['meta_http_seconds'] / max(1, self.stats['meta_http_hits'])
+            browser_avg = self.stats['meta_browser_seconds'] / max(1, self.stats['meta_browser_fallbacks'])
+            self.logger.info(
+                f"Pin page lookups: {self.stats['meta_http_hits']}/{meta_lookups} over HTTP "
+                f"({self.stats['meta_http_hits'] / meta_lookups * 100:.1f}%, avg {http_avg:.2f}s), "
+                f"{self.stats['meta_browser_fallbacks']} browser fallbacks (avg {browser_avg:.2f}s)"
+            )
+        if self.stats['first_image_seconds'] is not None:
+            self.logger.info(f"Time to first image: {self.stats['first_image_seconds']:.1f}s")
         self.logger.info(f"Total processed pins in history: {len(self.processed_pins)}")
+        self.browser_pool.log_stats()
+        self.pacer.log_stats()
+        self.route_policy.log_stats()
+        self.memory_governor.log_stats()
+        self.host_limiter.log_stats(self.logger)
+        self.file_committer.log_stats()
+        self.processed_pins.log_stats()
+        self.retry_queue.log_stats()
+        self.circuit_breaker.log_stats()
+        if self.stats['image_round_trips_baseline']:
+            saved = self.stats['image_round_trips_baseline'] - self.stats['image_round_trips']
+            self.logger.info(
+                f"Image round trips: {self.stats['image_round_trips']} vs {self.stats['image_round_trips_baseline']} with HEAD+GET "
+                f"({saved} saved), resolution cache {self.resolution_cache.stats['hits']} hits / {self.resolution_cache.stats['misses']} misses"
+            )
+        if self.similar_expander.stats['pages_expanded']:
+            self.logger.info(f"Async expansion: {self.similar_expander.stats['pages_expanded']} pin pages, peak {self.similar_expander.stats['peak_in_flight']} in flight")
         
         print(f"\n🎉 Multi-level scraping completed!")
         print(f"⏱️  Duration: {duration}")
@@ -621,7 +4421,33 @@ class PinterestScraper:
         print(f"✅ Successful downloads: {self.stats['successful_downloads']}")
         print(f"⏭️  Skipped duplicates: {self.stats['skipped_duplicates']}")
         print(f"❌ Failed downloads: {self.stats['failed_downloads']}")
+        if self.retry_queue.stats['dead_lettered']:
+            print(f"📮 Dead-lettered: {self.retry_queue.stats['dead_lettered']} (retry with --replay-dead-letters)")
         print(f"🗂️  Total in history: {len(self.processed_pins)}")
+        print(f"⏱️  Scroll pacing saved: {self.pacer.seconds_saved:.1f}s vs fixed sleeps")
+        print(f"🌐 Browser launches: {self.browser_pool.stats['browser_launches']}, pages served: {self.browser_pool.stats['pages_served']}")
+
+    def print_registry_report(self):
+        """Audit the sqlite registry: pins and bytes per keyword, files gone from disk, repeated content"""
+        registry = self.processed_pins
+        print(f"🗂️  Pin registry {self.PIN_REGISTRY_FILE}: {len(registry)} pins")
+        for keyword, pins, size in registry.keyword_counts():
+            print(f"   📊 {keyword or '(imported, no keyword)'}: {pins} pins, {size / (1024 * 1024):.1f} MB")
+        missing = registry.missing_files(self.SAVE_FOLDER)
+        print(f"❓ Pins without a file in {self.SAVE_FOLDER}: {len(missing)}")
+        for pin_id in missing[:20]:
+            print(f"   {pin_id}")
+        duplicates = registry.duplicate_hashes()
+        if duplicates:
+            print(f"♊ Identical files saved under several pins: {len(duplicates)} hashes")
+
+    def close(self):
+        """Commit pending downloads, close the processed pins store, release the browsers"""
+        self.file_committer.flush()
+        self.processed_pins.close()
+        self.browser_pool.close()
+        self.similar_expander.close()
+        self.logger.info("Browser pool closed")
 
 def get_automated_config():
     """Get automated configuration for scraping (no user input)"""
@@ -638,14 +4464,77 @@ def get_automated_config():
     print(f"📊 Similar pins per main pin: {similar_count}")
     print(f"📊 Estimated total pins: {main_count + (main_count * similar_count)}")
     print(f"📊 Chrome zoom: 25% (default)")
-    print(f"📊 Enhanced loading times: Enabled")
-    print("🔍 Features: Automated execution, 25% chrome zoom, enhanced loading times")
+    print("📊 Adaptive scroll pacing: Enabled")
+    print("🔍 Features: Automated execution, 25% chrome zoom, adaptive scroll pacing")
     print("🚀 Starting automated scraping process...")
     
     return keyword, main_count, similar_count
 
+def load_keywords_file(path):
+    """Read one keyword per line, skipping blank lines and # comments"""
+    with open(path, 'r', encoding='utf-8') as f:
+        keywords = [line.strip() for line in f]
+    return [keyword for keyword in keywords if keyword and not keyword.startswith('#')]
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pinterest Multi-Level Scraper")
+    parser.add_argument("--keywords-file", help="Text file with one keyword per line (batch mode)")
+    parser.add_argument("--max-depth", type=int, default=1, help="Levels of similar pins to crawl (default 1)")
+    parser.add_argument("--pin-budget", type=int, help="Stop collecting once this many NEW pins are found")
+    parser.add_argument("--collection-mode", choices=["dom", "xhr"], default="dom",
+                        help="Harvest pins from the rendered grid (dom) or from Pinterest's feed responses (xhr)")
+    parser.add_argument("--similar-concurrency", type=int, default=4,
+                        help="Pin pages expanded for similar pins at once (default 4)")
+    parser.add_argument("--target-images", type=int,
+                        help="Stream downloads during discovery and stop once this many images are saved")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted crawl from crawl_checkpoint.json")
+    parser.add_argument("--replay-dead-letters", action="store_true",
+                        help="Only retry the pins that failed for good in earlier runs (dead_letters.jsonl)")
+    parser.add_argument("--profile-dir",
+                        help="Reuse a persistent Chromium profile (warm disk cache, cookies) from this directory")
+    parser.add_argument("--cache-size-mb", type=int, default=512,
+                        help="Disk cache cap of the persistent profile (default 512 MB)")
+    parser.add_argument("--daemon", nargs="?", const="127.0.0.1:9300", metavar="HOST:PORT",
+                        help="Attach to warm browsers from browser_daemon.py (default 127.0.0.1:9300)")
+    parser.add_argument("--memory-budget-mb", type=int, default=4096,
+                        help="Browser memory budget; concurrent pin pages are reduced to fit (needs psutil)")
+    parser.add_argument("--heap-limit-mb", type=int, default=384,
+                        help="Reload a pin page on a fresh context once its JS heap exceeds this")
+    parser.add_argument("--download-concurrency", type=int, default=8,
+                        help="Pins downloading at once; each host is further paced by its adaptive limit (default 8)")
+    parser.add_argument("--probe-originals", action="store_true",
+                        help="HEAD known image URLs concurrently before downloading instead of only GETting speculatively")
+    parser.add_argument("--registry", choices=["json", "sqlite", "mmap"], default="json",
+                        help="Processed pins store: JSON snapshot + journal, a sqlite registry with per-file metadata, "
+                             "or a memory-mapped id index for very large histories")
+    parser.add_argument("--registry-report", action="store_true",
+                        help="Print per-keyword counts and pins whose files are missing from the sqlite registry, then exit")
+    parser.add_argument("--min-relevance", type=float, default=0.25,
+                        help="Don't expand pins whose title/alt text matches less than this share of the keyword (0-1)")
+    args = parser.parse_args()
+
     keyword, main_count, similar_count = get_automated_config()
 
-    scraper = PinterestScraper()
-    scraper.run(keyword, main_count, similar_count)
+    scraper = PinterestScraper(collection_mode=args.collection_mode, similar_concurrency=args.similar_concurrency,
+                               min_relevance=args.min_relevance, profile_dir=args.profile_dir,
+                               cache_size_mb=args.cache_size_mb,
+                               memory_budget_mb=args.memory_budget_mb, heap_limit_mb=args.heap_limit_mb,
+                               download_concurrency=args.download_concurrency, probe_originals=args.probe_originals,
+                               registry="sqlite" if args.registry_report else args.registry,
+                               daemon_address=load_daemon_lease().parse_address(args.daemon) if args.daemon else None)
+    if args.resume:
+        scraper.resume = scraper.checkpoint.load()
+    try:
+        if args.registry_report:
+            scraper.print_registry_report()
+        elif args.replay_dead_letters:
+            scraper.replay_dead_letters()
+        elif args.target_images:
+            scraper.run_streaming(keyword, args.target_images, main_count, similar_count, args.max_depth, args.pin_budget)
+        elif args.keywords_file:
+            scraper.run_batch(load_keywords_file(args.keywords_file), main_count, similar_count, args.max_depth, args.pin_budget)
+        else:
+            scraper.run(keyword, main_count, similar_count, args.max_depth, args.pin_budget)
+    finally:
+        scraper.close()
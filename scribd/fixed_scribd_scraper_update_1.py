@@ -5,18 +5,109 @@ import logging
 import time
 import base64
 import io
+import sys
 import json
-from datetime import datetime
+import argparse
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from bs4 import BeautifulSoup
-from urllib.parse import unquote
+from urllib.parse import unquote, urlparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from playwright.async_api import async_playwright
 from PyPDF2 import PdfReader, PdfWriter
 
+def load_daemon_lease():
+    """BrowserDaemonLease from browser_daemon.py at the repository root - imported only when a daemon is used"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.append(root)
+    from browser_daemon import BrowserDaemonLease
+    return BrowserDaemonLease
+
+class RateController:
+    """AIMD pacing per host, driven by the responses the scraper actually gets.
+
+    Documents load one at a time, so what adapts is the spacing between loads:
+    healthy fast responses shorten it step by step, 429/5xx double it, a response
+    far slower than usual lengthens it a step, and Retry-After pauses the host for
+    as long as the server asks.
+    """
+
+    OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, logger, initial_spacing=5.0, min_spacing=1.0, max_spacing=120.0, step=0.5):
+        self.logger = logger
+        self.initial_spacing = initial_spacing
+        self.min_spacing = min_spacing
+        self.max_spacing = max_spacing
+        self.step = step
+        self.hosts = {}
+
+    def _state(self, host):
+        return self.hosts.setdefault(host, {
+            'spacing': self.initial_spacing,
+            'next_start': 0.0,
+            'paused_until': 0.0,
+            'latency': None
+        })
+
+    def wait_turn(self, host):
+        """Sleep until the host may be hit again"""
+        state = self._state(host)
+        delay = max(state['next_start'], state['paused_until']) - time.monotonic()
+        if delay > 0:
+            self.logger.info(f"Waiting {delay:.1f} seconds before next request to {host}...")
+            time.sleep(delay)
+
+    def record(self, host, status, latency, headers=None):
+        """Adjust the host's spacing from one response (status None = no response seen)"""
+        state = self._state(host)
+        if status is None or status in self.OVERLOAD_STATUSES:
+            state['spacing'] = min(self.max_spacing, state['spacing'] * 2)
+            retry_after = self.retry_after_seconds(headers or {})
+            if retry_after:
+                state['paused_until'] = time.monotonic() + min(retry_after, self.max_spacing)
+            self.logger.warning(f"{host} answered {status or 'nothing'} - spacing now {state['spacing']:.1f}s"
+                                + (f", paused {retry_after:.0f}s (Retry-After)" if retry_after else ""))
+        elif latency is not None and state['latency'] is not None and latency > 3 * state['latency']:
+            state['spacing'] = min(self.max_spacing, state['spacing'] + self.step)
+        else:
+            state['spacing'] = max(self.min_spacing, state['spacing'] - self.step)
+
+        if latency is not None:
+            state['latency'] = latency if state['latency'] is None else 0.8 * state['latency'] + 0.2 * latency
+        state['next_start'] = time.monotonic() + state['spacing']
+
+    @staticmethod
+    def retry_after_seconds(headers):
+        """Retry-After as seconds (delta-seconds or HTTP date), None if absent"""
+        value = next((v for k, v in headers.items() if k.lower() == 'retry-after'), None)
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def limits(self):
+        """Current spacing and pause per host"""
+        now = time.monotonic()
+        return {
+            host: {'spacing': round(state['spacing'], 2), 'paused_for': round(max(0.0, state['paused_until'] - now), 1)}
+            for host, state in self.hosts.items()
+        }
+
 class ScribdScraper:
-    def __init__(self):
+    # Profile sub-directories that only hold re-downloadable cache data
+    CACHE_DIRS = ['Default/Cache', 'Default/Code Cache', 'Default/GPUCache', 'ShaderCache', 'GrShaderCache']
+
+    def __init__(self, profile_dir=None, cache_size_mb=512, daemon_address=None):
         self.query = None
         self.start_time = datetime.now()
         self.SAVE_FOLDER = "scraped_data/scribd_documents"
@@ -25,6 +116,16 @@ class ScribdScraper:
         os.makedirs(self.SAVE_FOLDER, exist_ok=True)
         self.logger = self.setup_logging()
         self.processed_doc_ids = set()  # Track processed doc_ids in current session
+        # Opt-in warm Chrome profile: cookies, consent state and JS bundles survive between documents
+        self.profile_dir = os.path.abspath(profile_dir) if profile_dir else None
+        self.cache_size_bytes = cache_size_mb * 1024 * 1024
+        self.cache_stats = {'requests': 0, 'hits': 0}
+        # Opt-in resident browser: attach to a warm Chrome from browser_daemon.py instead of launching one per document
+        self.daemon_address = daemon_address
+        self.daemon_lease = None
+        # Spacing between document loads adapts to Scribd's responses instead of a fixed 5 s sleep
+        self.rate_controller = RateController(self.logger)
+        self.last_load_seconds = None
 
     def setup_logging(self):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -47,6 +148,11 @@ class ScribdScraper:
         return logger
 
     def setup_driver(self):
+        if self.daemon_address:
+            driver = self.attach_daemon_driver()
+            if driver is not None:
+                return driver
+
         options = Options()
         options.add_argument('--headless')
         options.add_argument('--disable-gpu')
@@ -54,6 +160,10 @@ class ScribdScraper:
         options.add_argument('--log-level=3')
         options.add_argument('--window-size=1920,1080')
         options.add_argument('--print-to-pdf-no-header')
+        if self.profile_dir:
+            self.prune_profile_cache()
+            options.add_argument(f'--user-data-dir={self.profile_dir}')
+            options.add_argument(f'--disk-cache-size={self.cache_size_bytes}')
         
         # Add printing preferences similar to youtube_scribd_2.py
         prefs = {
@@ -85,6 +195,80 @@ class ScribdScraper:
         driver = webdriver.Chrome(options=options)
         return driver
 
+    def attach_daemon_driver(self):
+        """Attach ChromeDriver to a leased daemon browser; None if the daemon is unavailable"""
+        try:
+            self.daemon_lease = load_daemon_lease()(self.daemon_address, client="scribd")
+            options = Options()
+            # Launch flags and prefs don't apply to an existing browser - only the address does
+            options.debugger_address = self.daemon_lease.endpoint.replace('http://', '')
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            driver = webdriver.Chrome(options=options)
+            self.logger.info(f"Attached to daemon browser {self.daemon_lease.endpoint}")
+            return driver
+        except Exception as e:
+            self.logger.warning(f"Browser daemon unavailable ({e}) - launching Chrome locally")
+            self.release_daemon_browser()
+            return None
+
+    def release_daemon_browser(self):
+        """Hand the leased browser back; Selenium used its default profile, so the daemon restarts it clean"""
+        if self.daemon_lease is not None:
+            self.daemon_lease.release(dirty=True)
+            self.daemon_lease = None
+
+    def prune_profile_cache(self):
+        """Delete the oldest cache files of the profile until the caches fit in the size cap"""
+        cache_files = []
+        for cache_dir in self.CACHE_DIRS:
+            for root, _, files in os.walk(os.path.join(self.profile_dir, cache_dir)):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    cache_files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in cache_files)
+        if total <= self.cache_size_bytes:
+            return
+
+        removed = 0
+        for _, size, path in sorted(cache_files):
+            if total <= self.cache_size_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+        self.logger.info(f"Pruned {removed} cache files from {self.profile_dir} - cache now {total / (1024 * 1024):.0f} MB")
+
+    def read_performance_log(self, driver):
+        """Drain the driver's performance log: count disk-cache hits and return (status, headers) of the first document"""
+        document = (None, {})
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            self.logger.debug(f"Could not read performance log: {e}")
+            return document
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if message.get('method') == 'Network.responseReceived':
+                response = message['params'].get('response', {})
+                if self.profile_dir:
+                    self.cache_stats['requests'] += 1
+                    if response.get('fromDiskCache'):
+                        self.cache_stats['hits'] += 1
+                if message['params'].get('type') == 'Document' and document[0] is None:
+                    document = (response.get('status'), response.get('headers', {}))
+        return document
+
     def check_doc_id_exists(self, doc_id, query):
         """
         Check if doc_id already exists in:
@@ -188,7 +372,9 @@ class ScribdScraper:
 
     def print_page_to_pdf_bytes(self, driver, embed_url):
         self.logger.info(f"Navigating to {embed_url}")
+        load_start = time.monotonic()
         driver.get(embed_url)
+        self.last_load_seconds = time.monotonic() - load_start
         time.sleep(3)  # Initial wait for page load
         
         # Wait for document to load with better timeout handling
@@ -291,7 +477,10 @@ class ScribdScraper:
         self.mark_doc_id_processed(doc_id)
         
         embed_url = self.get_embed_url(doc_id)
+        host = urlparse(embed_url).netloc
+        self.rate_controller.wait_turn(host)
         driver = self.setup_driver()
+        self.last_load_seconds = None
         try:
             self.logger.info(f"[{index+1}] Processing doc_id {doc_id}")
             pdf_bytes = self.print_page_to_pdf_bytes(driver, embed_url)
@@ -306,7 +495,13 @@ class ScribdScraper:
             self.processed_doc_ids.discard(doc_id)
             return False
         finally:
+            try:
+                status, headers = self.read_performance_log(driver)
+                self.rate_controller.record(host, status, self.last_load_seconds, headers)
+            except Exception as e:
+                self.logger.warning(f"Could not record request pacing for {host}: {e}")
             driver.quit()
+            self.release_daemon_browser()
 
     async def run(self, query, max_docs=3):
         self.query = query
@@ -338,11 +533,6 @@ class ScribdScraper:
             if success:
                 processed_count += 1
                 self.logger.info(f"Progress: {processed_count}/{target_docs} documents processed")
-                
-                # Only wait if we have more documents to process and haven't reached target
-                if processed_count < target_docs and i < len(urls) - 1:
-                    self.logger.info("Waiting 5 seconds before next download...")
-                    time.sleep(5)
             else:
                 skipped_count += 1
                 self.logger.info(f"Continuing search... ({processed_count}/{target_docs} processed, {skipped_count} skipped)")
@@ -356,9 +546,23 @@ class ScribdScraper:
             print(f"Success: Processed {processed_count} new documents. {skipped_count} duplicates were skipped.")
         
         self.logger.info(f"Scraping process completed: {processed_count} processed, {skipped_count} skipped")
+        self.logger.info(f"Request pacing now: {self.rate_controller.limits()}")
+        if self.cache_stats['requests']:
+            hit_rate = self.cache_stats['hits'] / self.cache_stats['requests'] * 100
+            self.logger.info(f"Profile disk cache: {self.cache_stats['hits']}/{self.cache_stats['requests']} responses ({hit_rate:.1f}% hit rate)")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scribd Document Scraper")
+    parser.add_argument("--profile-dir",
+                        help="Reuse a persistent Chrome profile (warm disk cache, cookies) from this directory")
+    parser.add_argument("--cache-size-mb", type=int, default=512,
+                        help="Disk cache cap of the persistent profile (default 512 MB)")
+    parser.add_argument("--daemon", nargs="?", const="127.0.0.1:9300", metavar="HOST:PORT",
+                        help="Attach to warm browsers from browser_daemon.py (default 127.0.0.1:9300)")
+    args = parser.parse_args()
+
     async def main():
-        scraper = ScribdScraper()
+        scraper = ScribdScraper(profile_dir=args.profile_dir, cache_size_mb=args.cache_size_mb,
+                                daemon_address=load_daemon_lease().parse_address(args.daemon) if args.daemon else None)
         await scraper.run("Australia medicare number scribd", max_docs=100)
     asyncio.run(main())